@@ -0,0 +1,28 @@
+"""
+Dispatcharr Timeshift Plugin - AppConfig
+
+Django AppConfig whose ready() installs the hooks at the correct
+lifecycle point (app registry fully populated, exactly once per process,
+no per-request signal dispatch).
+
+IMPORTANT - WHY plugin.py STILL HAS A FALLBACK:
+    ready() only runs if this package is listed in INSTALLED_APPS.
+    Dispatcharr's PluginManager does NOT register plugins as Django apps;
+    it just imports plugin.py. So for a stock Dispatcharr install this
+    config never fires and the auto-install path at the bottom of
+    plugin.py does the work. Users who add
+    "dispatcharr_timeshift.apps.TimeshiftConfig" to INSTALLED_APPS get
+    the cleaner ready()-based install, and the plugin.py fallback
+    becomes a no-op thanks to the _hooks_installed flag.
+"""
+
+from django.apps import AppConfig
+
+
+class TimeshiftConfig(AppConfig):
+    name = "dispatcharr_timeshift"
+    verbose_name = "Dispatcharr Timeshift"
+
+    def ready(self):
+        from .plugin import _auto_install_hooks
+        _auto_install_hooks()
@@ -50,22 +50,164 @@ GitHub: https://github.com/cedric-marcoux/dispatcharr_timeshift
 """
 
 import re
+import time
+import base64
 import logging
+import functools
+from datetime import datetime, timedelta
 
 logger = logging.getLogger("plugins.dispatcharr_timeshift.hooks")
 
+# XMLTV timestamps look like: 20251128143000 +0000
+# Compiled once at import, as a BYTES pattern so the generate_epg hook can
+# substitute directly on the raw response chunks without a decode/encode pass.
+_XMLTV_TS_RE = re.compile(rb'(\d{14}) ([+-]\d{4})')
+
+# Boundary helpers for the chunked XMLTV generator. Streaming chunks are
+# arbitrary byte splits, so a 20-byte timestamp can straddle two chunks.
+# _XMLTV_TS_END_RE detects a COMPLETE timestamp at the end of a buffer
+# (nothing needs to be held back); _XMLTV_TS_PARTIAL_RE finds the longest
+# suffix that could be the beginning of a timestamp (held back and glued
+# onto the next chunk). A partial suffix is at most 19 bytes.
+_XMLTV_TS_END_RE = re.compile(rb'\d{14} [+-]\d{4}$')
+_XMLTV_TS_PARTIAL_RE = re.compile(rb'(?:\d{14} [+-]\d{0,3}|\d{14} ?|\d{1,14})$')
+
+# TTL cache for plugin config/enabled state.
+# URLResolver.resolve is patched below and runs for EVERY HTTP request hitting
+# Django, so the enabled-check must not cost a DB round-trip per request.
+# The cache holds both the 'enabled' flag and the settings dict, refreshed
+# together with a single query at most once per TTL window. Toggling the
+# plugin in the UI therefore takes effect within _CACHE_TTL seconds.
+_CACHE_TTL = 10.0
+_CFG_CACHE = {'enabled': None, 'config': None, 'ts': 0.0}
+
+_CONFIG_DEFAULTS = {
+    'timezone': 'Europe/Brussels',
+    'language': 'en',
+    'debug_mode': False,
+    'url_format': 'auto',
+    'custom_url_template': '',
+    'nginx_accel': False
+}
+
+
+class _GETOverride:
+    """
+    Thin read-only view over request.GET that overrides selected keys.
+
+    The EPG delegation path only needs to substitute stream_id before
+    handing off to the original xc_get_epg; QueryDict.copy() duplicated
+    every GET parameter per request just for that. This wrapper delegates
+    all reads and layers the override on top without copying.
+    """
+    __slots__ = ('_inner', '_override')
+
+    def __init__(self, inner, override):
+        self._inner = inner
+        self._override = override
+
+    def __getitem__(self, key):
+        if key in self._override:
+            return self._override[key]
+        return self._inner[key]
+
+    def __contains__(self, key):
+        return key in self._override or key in self._inner
+
+    def __iter__(self):
+        return iter(set(self._inner) | set(self._override))
+
+    def get(self, key, default=None):
+        if key in self._override:
+            return self._override[key]
+        return self._inner.get(key, default)
+
+    def getlist(self, key, default=None):
+        if key in self._override:
+            return [self._override[key]]
+        return self._inner.getlist(key, default)
+
+
+@functools.lru_cache(maxsize=8192)
+def _convert_xmltv_ts(timestamp_bytes, tz_name):
+    """
+    Convert one XMLTV timestamp (UTC) to the named local timezone.
+
+    Memoized at module scope: EPG feeds repeat the same timestamps heavily
+    (every programme boundary appears as both a stop and the next start,
+    clients refetch the feed, and multiple clients fetch the same feed),
+    so most calls are cache hits that skip strptime/astimezone/strftime
+    entirely. Returns the replacement bytes, or None if the timestamp
+    could not be parsed.
+    """
+    try:
+        utc_time = datetime.strptime(timestamp_bytes.decode('ascii'), "%Y%m%d%H%M%S")
+        utc_time = utc_time.replace(tzinfo=_zi("UTC"))
+        return utc_time.astimezone(_zi(tz_name)).strftime("%Y%m%d%H%M%S %z").encode('ascii')
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=32)
+def _zi(name):
+    """
+    Memoized ZoneInfo constructor.
+
+    ZoneInfo(name) parses tzdata from disk; the EPG and XMLTV hooks need the
+    configured timezone (plus UTC) on every request, so resolve each name
+    exactly once per process.
+    """
+    from zoneinfo import ZoneInfo
+    return ZoneInfo(name)
+
+
+def _refresh_config_cache():
+    """
+    Reload enabled flag + settings from database with a single query.
+
+    Populates _CFG_CACHE so that _is_plugin_enabled() and _get_plugin_config()
+    are dict lookups until the TTL expires. Any DB/import error leaves the
+    plugin disabled with default settings (same behavior as before caching).
+    """
+    enabled = False
+    config = dict(_CONFIG_DEFAULTS)
+    try:
+        from apps.plugins.models import PluginConfig
+        row = PluginConfig.objects.only('enabled', 'settings').filter(
+            key='dispatcharr_timeshift'
+        ).first()
+        if row:
+            enabled = row.enabled
+            settings = row.settings or {}
+            config = {
+                'timezone': settings.get('timezone', 'Europe/Brussels').strip(),
+                'language': settings.get('language', 'en').strip(),
+                'debug_mode': bool(settings.get('debug_mode', False)),
+                'url_format': settings.get('url_format', 'auto').strip(),
+                'custom_url_template': settings.get('custom_url_template', '').strip(),
+                'nginx_accel': bool(settings.get('nginx_accel', False))
+            }
+    except Exception:
+        pass
+    _CFG_CACHE['enabled'] = enabled
+    _CFG_CACHE['config'] = config
+    _CFG_CACHE['ts'] = time.monotonic()
+
 # Store original functions for potential restoration
 _original_xc_get_live_streams = None
 _original_stream_xc = None
 _original_xc_get_epg = None
 _original_generate_epg = None
-_original_url_callbacks = {}
+# (pattern, original_callback) tuples for every URL pattern whose callback
+# we replaced. Restoration is a single pass over this list instead of a
+# rescan of urlpatterns.
+_patched_patterns = []
 _original_resolve = None
 
 
 def _get_plugin_config():
     """
-    Get plugin configuration from database.
+    Get plugin configuration (TTL-cached, see _refresh_config_cache).
 
     Returns all plugin settings configured in plugin UI.
     Used by multiple hooks to avoid duplicating config loading code.
@@ -79,45 +221,87 @@ def _get_plugin_config():
             'custom_url_template': str
         }
     """
-    defaults = {
-        'timezone': 'Europe/Brussels',
-        'language': 'en',
-        'debug_mode': False,
-        'url_format': 'auto',
-        'custom_url_template': ''
-    }
-    try:
-        from apps.plugins.models import PluginConfig
-        config = PluginConfig.objects.filter(key='dispatcharr_timeshift').first()
-        if config and config.settings:
-            return {
-                'timezone': config.settings.get('timezone', 'Europe/Brussels').strip(),
-                'language': config.settings.get('language', 'en').strip(),
-                'debug_mode': bool(config.settings.get('debug_mode', False)),
-                'url_format': config.settings.get('url_format', 'auto').strip(),
-                'custom_url_template': config.settings.get('custom_url_template', '').strip()
-            }
-    except Exception:
-        pass
-    return defaults
+    if time.monotonic() - _CFG_CACHE['ts'] >= _CACHE_TTL:
+        _refresh_config_cache()
+    return _CFG_CACHE['config']
 
 
 def _is_plugin_enabled():
     """
-    Check if plugin is enabled in database.
+    Check if plugin is enabled (TTL-cached, see _refresh_config_cache).
 
     Called at runtime by each patched function to determine if timeshift
-    logic should execute. This enables hot enable/disable without restart.
+    logic should execute. This enables hot enable/disable without restart,
+    with at most _CACHE_TTL seconds of propagation delay.
 
     Returns:
         bool: True if plugin is enabled, False otherwise
     """
-    try:
-        from apps.plugins.models import PluginConfig
-        config = PluginConfig.objects.get(key='dispatcharr_timeshift')
-        return config.enabled
-    except Exception:
-        return False
+    if time.monotonic() - _CFG_CACHE['ts'] >= _CACHE_TTL:
+        _refresh_config_cache()
+    return _CFG_CACHE['enabled']
+
+
+# Django / Dispatcharr names used by the patched hot paths. They can't be
+# imported at plugin-module load time (the app registry may not be populated
+# yet), so install_hooks() resolves them once via _import_django_deps() and
+# publishes them as module globals. The patched functions then read plain
+# globals instead of paying a sys.modules lookup + attribute fetch per
+# import statement per request.
+Channel = None
+Stream = None
+ChannelStream = None
+ChannelProfileMembership = None
+User = None
+stream_ts = None
+get_object_or_404 = None
+JsonResponse = None
+Http404 = None
+StreamingHttpResponse = None
+ResolverMatch = None
+django_timezone = None
+IntegerField = None
+BigIntegerField = None
+DateTimeField = None
+F = None
+Func = None
+Value = None
+Exists = None
+OuterRef = None
+KeyTextTransform = None
+Cast = None
+Extract = None
+
+
+def _import_django_deps():
+    """
+    Resolve all Django/Dispatcharr imports used by the patched functions.
+
+    Called once from install_hooks(), at which point the app registry is
+    fully populated. See the comment above the globals block.
+    """
+    global Channel, Stream, ChannelStream, ChannelProfileMembership
+    global User, stream_ts, get_object_or_404
+    global JsonResponse, Http404, StreamingHttpResponse, ResolverMatch
+    global django_timezone
+    global IntegerField, BigIntegerField, DateTimeField, F, Func, Value
+    global Exists, OuterRef, KeyTextTransform, Cast, Extract
+
+    from apps.accounts.models import User
+    from apps.channels.models import (
+        Channel, ChannelProfileMembership, ChannelStream, Stream
+    )
+    from apps.proxy.ts_proxy.views import stream_ts
+    from django.shortcuts import get_object_or_404
+    from django.http import Http404, JsonResponse, StreamingHttpResponse
+    from django.urls import ResolverMatch
+    from django.utils import timezone as django_timezone
+    from django.db.models import (
+        BigIntegerField, DateTimeField, Exists, F, Func, IntegerField,
+        OuterRef, Value
+    )
+    from django.db.models.fields.json import KeyTextTransform
+    from django.db.models.functions import Cast, Extract
 
 
 def install_hooks():
@@ -130,6 +314,8 @@ def install_hooks():
     logger.info("[Timeshift] Installing hooks...")
 
     try:
+        _import_django_deps()
+        _ensure_stream_index()
         _patch_xc_get_live_streams()
         _patch_stream_xc()
         _patch_xc_get_epg()
@@ -142,6 +328,58 @@ def install_hooks():
         return False
 
 
+def _ensure_stream_index():
+    """
+    Create a functional index on Stream.custom_properties->>'stream_id'.
+
+    The per-request channel lookups (stream_xc, xc_get_epg, timeshift_proxy)
+    all filter on custom_properties__stream_id. Without an index that is a
+    sequential scan over every Stream row on each playback/EPG request.
+
+    We can't ship a Django migration for apps.channels (the plugin doesn't
+    modify Dispatcharr source), so the index is created here with
+    CREATE INDEX IF NOT EXISTS at install time. Postgres only; any failure
+    (permissions, non-Postgres backend) is logged and ignored - the plugin
+    works without the index, just slower.
+    """
+    # Cross-process gate: every uWSGI worker runs install_hooks() because
+    # the in-memory monkey-patches must exist in each worker, but this DDL
+    # is an external side effect that only needs to run once per host.
+    # The first worker to grab the flock issues the statement; workers that
+    # find it held skip. The DDL is idempotent (IF NOT EXISTS), so if the
+    # lock can't be used we just fall back to the old N-workers behavior.
+    lock_file = None
+    try:
+        import fcntl
+        lock_file = open('/tmp/dispatcharr_timeshift_index.lock', 'w')
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        if lock_file is not None:
+            lock_file.close()
+            logger.info("[Timeshift] Stream index DDL being handled by another worker, skipping")
+            return
+    except Exception:
+        lock_file = None
+
+    try:
+        from django.db import connection
+        if connection.vendor != 'postgresql':
+            return
+        from apps.channels.models import Stream
+        table = Stream._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS stream_provider_sid_idx "
+                f"ON {table} ((custom_properties->>'stream_id'))"
+            )
+        logger.info("[Timeshift] Ensured stream_provider_sid_idx index exists")
+    except Exception as e:
+        logger.info(f"[Timeshift] Could not create provider stream_id index (non-fatal): {e}")
+    finally:
+        if lock_file is not None:
+            lock_file.close()
+
+
 def _patch_xc_get_live_streams():
     """
     Patch xc_get_live_streams to:
@@ -161,15 +399,14 @@ def _patch_xc_get_live_streams():
 
     _original_xc_get_live_streams = output_views.xc_get_live_streams
 
-    def patched_xc_get_live_streams(request, user, category_id=None):
+    def patched_xc_get_live_streams(request, user, category_id=None,
+                                     _enabled=_is_plugin_enabled):
         streams = _original_xc_get_live_streams(request, user, category_id)
 
         # Skip if plugin is disabled
-        if not _is_plugin_enabled():
+        if not _enabled():
             return streams
 
-        from apps.channels.models import Channel
-
         config = _get_plugin_config()
         debug = config['debug_mode']
 
@@ -178,44 +415,88 @@ def _patch_xc_get_live_streams():
 
         timeshift_count = 0
 
+        # BULK FETCH: One query for all channels instead of 2+ per channel.
+        # Previously each stream in the response cost a Channel lookup plus a
+        # per-channel scan of channel.streams (>= 2 SQL round-trips each, so
+        # ~2000 queries for a 1000-channel provider). A single ChannelStream
+        # query ordered by (channel_id, order) gives us every channel's
+        # streams in priority order; the loop below is then pure Python.
+        # Coerce ids to int up front so dict keys always match the integer
+        # channel_id values coming back from the DB (the upstream response
+        # may carry them as strings).
+        ids = []
+        for sd in streams:
+            try:
+                ids.append(int(sd['stream_id']))
+            except (KeyError, TypeError, ValueError):
+                continue
+        # The casts run DB-side (JSONB ->> plus integer cast), so rows arrive
+        # already typed and the Python loop below does no int() coercion.
+        # Missing keys cast to NULL/None, but a NON-numeric value (a messy
+        # provider import storing "tv_archive": "true" or "") makes the
+        # cast raise mid-iteration and would otherwise kill the whole
+        # response - the plugin doesn't control what providers put in
+        # custom_properties. On any failure here, degrade to returning the
+        # upstream streams un-enhanced (no tv_archive, internal stream ids)
+        # rather than 500ing the channel list.
+        streams_by_channel = {}
+        try:
+            for row in ChannelStream.objects.filter(channel_id__in=ids).annotate(
+                tv_arch=Cast(
+                    KeyTextTransform('tv_archive', 'stream__custom_properties'),
+                    IntegerField()
+                ),
+                tv_arch_dur=Cast(
+                    KeyTextTransform('tv_archive_duration', 'stream__custom_properties'),
+                    IntegerField()
+                ),
+                provider_sid=Cast(
+                    KeyTextTransform('stream_id', 'stream__custom_properties'),
+                    BigIntegerField()
+                ),
+            ).order_by('channel_id', 'order').values(
+                'channel_id', 'channel__name', 'stream__name',
+                'tv_arch', 'tv_arch_dur', 'provider_sid'
+            ):
+                streams_by_channel.setdefault(row['channel_id'], []).append(row)
+        except Exception as e:
+            logger.error(f"[Timeshift] API: Bulk stream fetch failed (corrupt custom_properties?), "
+                         f"returning streams unenhanced: {e}")
+            return streams
+
         for stream_data in streams:
             original_stream_id = stream_data.get('stream_id')
             try:
-                channel = Channel.objects.filter(id=original_stream_id).first()
-                if not channel:
+                channel_streams = (
+                    streams_by_channel.get(int(original_stream_id))
+                    if original_stream_id is not None else None
+                )
+                if not channel_streams:
                     if debug:
-                        logger.info(f"[Timeshift] API: Channel not found for internal_id={original_stream_id}")
+                        logger.info(f"[Timeshift] API: No streams for channel internal_id={original_stream_id}")
                     continue
 
-                # ✅ NEW: Check ALL streams for catch-up support (fallback chain)
+                channel_name = channel_streams[0]['channel__name']
+
+                # ✅ Check ALL streams for catch-up support (fallback chain)
                 tv_archive = 0
                 tv_archive_duration = 0
-                catchup_stream = None
+                catchup_name = None
 
                 if debug:
-                    logger.info(f"[Timeshift] API: Scanning {channel.name} for catch-up support...")
+                    logger.info(f"[Timeshift] API: Scanning {channel_name} for catch-up support...")
 
-                for stream in channel.streams.order_by('channelstream__order'):
-                    stream_props = stream.custom_properties or {}
-                    if int(stream_props.get('tv_archive', 0)):
+                for row in channel_streams:
+                    if row['tv_arch']:
                         tv_archive = 1
-                        tv_archive_duration = int(stream_props.get('tv_archive_duration', 0))
-                        catchup_stream = stream
+                        tv_archive_duration = row['tv_arch_dur'] or 0
+                        catchup_name = row['stream__name']
                         if debug:
-                            logger.info(f"[Timeshift] API:   {stream.name}: tv_archive=1 ✅ (duration={tv_archive_duration}d)")
+                            logger.info(f"[Timeshift] API:   {catchup_name}: tv_archive=1 ✅ (duration={tv_archive_duration}d)")
                         break  # Use first stream with catch-up
                     else:
                         if debug:
-                            logger.info(f"[Timeshift] API:   {stream.name}: tv_archive=0")
-
-                # Get first stream for provider_stream_id (API response needs it)
-                first_stream = channel.streams.order_by('channelstream__order').first()
-                if not first_stream:
-                    if debug:
-                        logger.info(f"[Timeshift] API: No streams for channel '{channel.name}' (id={original_stream_id})")
-                    continue
-
-                props = first_stream.custom_properties or {}
+                            logger.info(f"[Timeshift] API:   {row['stream__name']}: tv_archive=0")
 
                 # Add tv_archive values (based on ANY stream with catch-up)
                 stream_data['tv_archive'] = tv_archive
@@ -224,14 +505,15 @@ def _patch_xc_get_live_streams():
                 if tv_archive:
                     timeshift_count += 1
                     if debug:
-                        logger.info(f"[Timeshift] API: {channel.name} → tv_archive=1 (from {catchup_stream.name if catchup_stream else 'unknown'}), duration={stream_data['tv_archive_duration']}d")
+                        logger.info(f"[Timeshift] API: {channel_name} → tv_archive=1 (from {catchup_name or 'unknown'}), duration={stream_data['tv_archive_duration']}d")
 
-                # Replace stream_id with provider's stream_id (use first stream for consistency)
-                provider_stream_id = props.get('stream_id')
+                # Replace stream_id with provider's stream_id (use first
+                # stream for consistency; already an int from the SQL cast)
+                provider_stream_id = channel_streams[0]['provider_sid']
                 if provider_stream_id:
                     if debug:
-                        logger.info(f"[Timeshift] API: {channel.name} → stream_id {original_stream_id} → {provider_stream_id}")
-                    stream_data['stream_id'] = int(provider_stream_id)
+                        logger.info(f"[Timeshift] API: {channel_name} → stream_id {original_stream_id} → {provider_stream_id}")
+                    stream_data['stream_id'] = provider_stream_id
 
             except Exception as e:
                 logger.error(f"[Timeshift] API: Error enhancing stream internal_id={original_stream_id}: {e}")
@@ -264,31 +546,27 @@ def _patch_stream_xc():
         URL patterns keep a reference to the original function from import time.
         We must also update the callback in the urlpatterns list.
     """
-    global _original_stream_xc, _original_url_callbacks
+    global _original_stream_xc
 
     from apps.proxy.ts_proxy import views as proxy_views
     from dispatcharr import urls as main_urls
 
     _original_stream_xc = proxy_views.stream_xc
 
-    def patched_stream_xc(request, username, password, channel_id):
+    def patched_stream_xc(request, username, password, channel_id,
+                          _enabled=_is_plugin_enabled):
         # If plugin is disabled, use original function
-        if not _is_plugin_enabled():
+        if not _enabled():
             return _original_stream_xc(request, username, password, channel_id)
 
-        import pathlib
-        from django.shortcuts import get_object_or_404
-        from django.http import JsonResponse
-        from apps.accounts.models import User
-        from apps.channels.models import Channel, Stream
-
         config = _get_plugin_config()
         debug = config['debug_mode']
 
         user = get_object_or_404(User, username=username)
 
         # Extract channel ID without extension (e.g., "12345.ts" -> "12345")
-        channel_id_str = pathlib.Path(channel_id).stem
+        # - a plain rpartition beats constructing a PurePath per request
+        channel_id_str = channel_id.rpartition('.')[0] or channel_id
 
         if debug:
             logger.info(f"[Timeshift] Live: Request user={username}, channel_id={channel_id_str}")
@@ -305,18 +583,16 @@ def _patch_stream_xc():
                 logger.info(f"[Timeshift] Live: Auth failed - wrong password for user {username}")
             return JsonResponse({"error": "Invalid credentials"}, status=401)
 
-        channel = None
-
         # TIMESHIFT FIX: First try to find by provider stream_id
-        # This handles the case where API returns provider's stream_id
-        stream = Stream.objects.filter(
-            custom_properties__stream_id=channel_id_str,
-            m3u_account__account_type='XC'
-        ).first()
-        if stream:
-            channel = stream.channels.first()
-            if channel and debug:
-                logger.info(f"[Timeshift] Live: Found by provider_stream_id={channel_id_str} → {channel.name}")
+        # This handles the case where API returns provider's stream_id.
+        # One joined query straight to Channel (instead of Stream lookup +
+        # stream.channels round-trip), fetching only the columns used below.
+        channel = Channel.objects.filter(
+            streams__custom_properties__stream_id=channel_id_str,
+            streams__m3u_account__account_type='XC'
+        ).only('id', 'uuid', 'name', 'user_level').first()
+        if channel and debug:
+            logger.info(f"[Timeshift] Live: Found by provider_stream_id={channel_id_str} → {channel.name}")
 
         # Fall back to original behavior (internal ID lookup)
         if not channel:
@@ -334,13 +610,18 @@ def _patch_stream_xc():
                         }
                         channel = Channel.objects.filter(**filters).first()
                     else:
-                        filters = {
-                            "id": internal_id,
-                            "channelprofilemembership__enabled": True,
-                            "user_level__lte": user.user_level,
-                            "channelprofilemembership__channel_profile__in": user.channel_profiles.all()
-                        }
-                        channel = Channel.objects.filter(**filters).distinct().first()
+                        # EXISTS short-circuits at the first enabled
+                        # membership; a join + DISTINCT forced Postgres to
+                        # materialize and sort every matching row
+                        membership = ChannelProfileMembership.objects.filter(
+                            channel=OuterRef('pk'),
+                            enabled=True,
+                            channel_profile__in=user.channel_profiles.all()
+                        )
+                        channel = Channel.objects.filter(
+                            id=internal_id,
+                            user_level__lte=user.user_level
+                        ).filter(Exists(membership)).first()
                 else:
                     channel = Channel.objects.filter(id=internal_id).first()
 
@@ -393,7 +674,6 @@ def _patch_stream_xc():
             return JsonResponse({"error": "Not found"}, status=404)
 
         # Call the original stream_ts function
-        from apps.proxy.ts_proxy.views import stream_ts
         # Handle both DRF requests and regular Django requests
         actual_request = getattr(request, '_request', request)
         return stream_ts(actual_request, str(channel.uuid))
@@ -402,11 +682,20 @@ def _patch_stream_xc():
     proxy_views.stream_xc = patched_stream_xc
 
     # CRITICAL: Also patch the URL patterns callbacks
-    # Django keeps references to the original function in urlpatterns
-    # Store original callbacks so we can restore them later
-    for pattern in main_urls.urlpatterns:
-        if hasattr(pattern, 'callback') and pattern.callback == _original_stream_xc:
-            _original_url_callbacks[id(pattern)] = _original_stream_xc
+    # Django keeps references to the original function in urlpatterns.
+    # Walk the pattern tree iteratively so URLPatterns nested inside
+    # include()d URLResolvers are reached too, and record each patched
+    # pattern with its original callback for single-pass restoration.
+    stack = list(main_urls.urlpatterns)
+    while stack:
+        pattern = stack.pop()
+        nested = getattr(pattern, 'url_patterns', None)
+        if nested is not None:
+            # URLResolver (include) - descend instead of touching .callback
+            stack.extend(nested)
+            continue
+        if getattr(pattern, 'callback', None) is _original_stream_xc:
+            _patched_patterns.append((pattern, _original_stream_xc))
             pattern.callback = patched_stream_xc
             logger.info(f"[Timeshift] Patched URL pattern: {pattern.name}")
 
@@ -441,14 +730,11 @@ def _patch_xc_get_epg():
 
     _original_xc_get_epg = output_views.xc_get_epg
 
-    def patched_xc_get_epg(request, user, short=False):
+    def patched_xc_get_epg(request, user, short=False, _enabled=_is_plugin_enabled):
         # If plugin is disabled, use original function
-        if not _is_plugin_enabled():
+        if not _enabled():
             return _original_xc_get_epg(request, user, short)
 
-        from django.http import Http404
-        from apps.channels.models import Channel, Stream
-
         config = _get_plugin_config()
         debug = config['debug_mode']
 
@@ -464,15 +750,16 @@ def _patch_xc_get_epg():
 
         try:
             # TIMESHIFT FIX: First try to find by provider stream_id
-            # This handles the case where API returns provider's stream_id
-            stream = Stream.objects.filter(
-                custom_properties__stream_id=str(channel_id),
-                m3u_account__account_type='XC'
-            ).first()
-            if stream:
-                channel = stream.channels.first()
-                if channel and debug:
-                    logger.info(f"[Timeshift] EPG: Found by provider_stream_id={channel_id} → {channel.name}")
+            # This handles the case where API returns provider's stream_id.
+            # Single joined query to Channel, same shape as the stream_xc
+            # lookup ('epg_data' in only() keeps the FK id loaded for the
+            # custom EPG branch below).
+            channel = Channel.objects.filter(
+                streams__custom_properties__stream_id=str(channel_id),
+                streams__m3u_account__account_type='XC'
+            ).only('id', 'name', 'user_level', 'epg_data').first()
+            if channel and debug:
+                logger.info(f"[Timeshift] EPG: Found by provider_stream_id={channel_id} → {channel.name}")
 
             # Fall back to original behavior (internal ID lookup)
             if not channel:
@@ -487,13 +774,17 @@ def _patch_xc_get_epg():
                             user_level__lte=user.user_level
                         ).first()
                     else:
-                        filters = {
-                            "id": channel_id,
-                            "channelprofilemembership__enabled": True,
-                            "user_level__lte": user.user_level,
-                            "channelprofilemembership__channel_profile__in": user.channel_profiles.all()
-                        }
-                        channel = Channel.objects.filter(**filters).distinct().first()
+                        # Same EXISTS rewrite as the stream_xc hook - avoids
+                        # the join + DISTINCT sort
+                        membership = ChannelProfileMembership.objects.filter(
+                            channel=OuterRef('pk'),
+                            enabled=True,
+                            channel_profile__in=user.channel_profiles.all()
+                        )
+                        channel = Channel.objects.filter(
+                            id=channel_id,
+                            user_level__lte=user.user_level
+                        ).filter(Exists(membership)).first()
                 else:
                     channel = Channel.objects.filter(id=channel_id).first()
 
@@ -534,15 +825,9 @@ def _patch_xc_get_epg():
 
             if has_tv_archive and not short:
                 # CUSTOM EPG RESPONSE: Include past programs for timeshift
-                from datetime import timedelta
-                from django.utils import timezone as django_timezone
-                from zoneinfo import ZoneInfo
-                import base64
-
                 # Get plugin config
                 timezone_str = config['timezone']
                 language = config['language']
-                local_tz = ZoneInfo(timezone_str)
 
                 archive_duration_days = int(props.get('tv_archive_duration', 7))
                 start_date = django_timezone.now() - timedelta(days=archive_duration_days)
@@ -550,52 +835,73 @@ def _patch_xc_get_epg():
                 if debug:
                     logger.info(f"[Timeshift] EPG: Generating custom EPG for {channel.name}, archive={archive_duration_days}d, tz={timezone_str}")
 
-                # Get programs from the last X days until future
+                # Get programs from the last X days until future.
+                # values_list() returns plain tuples via the C-level row
+                # factory - no model __init__, signals or deferred-field
+                # machinery per row - and .iterator() lets Postgres stream
+                # the rows through a server-side cursor.
+                # Epoch seconds and the local wall time are computed DB-side
+                # (EXTRACT(epoch ...) and timezone(zone, ts)), so the Python
+                # loop does no per-row .timestamp()/.astimezone() calls.
+                # tzinfo=UTC is required: without it Django wraps the column
+                # in AT TIME ZONE <current timezone> and Postgres extracts
+                # the epoch from that wall time as if it were UTC, shifting
+                # every timestamp by the host's UTC offset whenever the
+                # active timezone isn't UTC (e.g. Docker with TZ set).
                 programs = channel.epg_data.programs.filter(
                     start_time__gte=start_date
-                ).order_by('start_time') if channel.epg_data else []
+                ).annotate(
+                    start_epoch=Extract('start_time', 'epoch', tzinfo=_zi('UTC')),
+                    end_epoch=Extract('end_time', 'epoch', tzinfo=_zi('UTC')),
+                    start_local=Func(
+                        Value(timezone_str), F('start_time'),
+                        function='timezone', output_field=DateTimeField()
+                    ),
+                    end_local=Func(
+                        Value(timezone_str), F('end_time'),
+                        function='timezone', output_field=DateTimeField()
+                    ),
+                ).order_by('start_time').values_list(
+                    'id', 'start_epoch', 'end_epoch',
+                    'start_local', 'end_local', 'title', 'description'
+                ).iterator(chunk_size=2000) if channel.epg_data else []
 
                 output = {"epg_listings": []}
                 now = django_timezone.now()
+                now_ts = int(now.timestamp())
                 archive_count = 0
+                append = output['epg_listings'].append
+                _b64 = base64.b64encode
 
-                for program in programs:
-                    start = program.start_time
-                    end = program.end_time
-                    title = program.title or ""
-                    description = program.description or ""
+                for pid, start_ts, end_ts, start_local, end_local, title, description in programs:
+                    title = title or ""
+                    description = description or ""
 
-                    # Convert timestamps to local timezone
-                    start_local = start.astimezone(local_tz)
-                    end_local = end.astimezone(local_tz)
+                    start_ts = int(start_ts)
+                    end_ts = int(end_ts)
 
-                    # Generate unique ID for each program using timestamp
-                    program_id = int(start.timestamp())
+                    # has_archive: past program within archive duration
+                    if end_ts < now_ts and (now_ts - end_ts) // 86400 <= archive_duration_days:
+                        has_archive = 1  # INTEGER not string
+                        archive_count += 1
+                    else:
+                        has_archive = 0
 
-                    program_output = {
-                        "id": str(program_id),  # STRING - unique per program
-                        "epg_id": str(program.id) if hasattr(program, 'id') and program.id else str(program_id),
-                        "title": base64.b64encode(title.encode()).decode(),
+                    append({
+                        "id": str(start_ts),  # STRING - unique per program
+                        "epg_id": str(pid) if pid else str(start_ts),
+                        "title": _b64(title.encode('utf-8', 'replace')).decode('ascii'),
                         "lang": language,  # From plugin settings
                         "start": start_local.strftime("%Y-%m-%d %H:%M:%S"),  # Local time
                         "end": end_local.strftime("%Y-%m-%d %H:%M:%S"),      # Local time
-                        "description": base64.b64encode(description.encode()).decode(),
+                        "description": _b64(description.encode('utf-8', 'replace')).decode('ascii'),
                         "channel_id": str(props.get('epg_channel_id') or channel.id),  # STRING
-                        "start_timestamp": str(int(start.timestamp())),  # STRING not int
-                        "stop_timestamp": str(int(end.timestamp())),     # STRING not int
+                        "start_timestamp": str(start_ts),  # STRING not int
+                        "stop_timestamp": str(end_ts),     # STRING not int
                         "stream_id": str(props.get('stream_id', channel.id)),  # Provider's stream_id
-                        "now_playing": 0 if start > now or end < now else 1,
-                        "has_archive": 0,  # INTEGER not string - default
-                    }
-
-                    # Set has_archive for past programs within archive duration
-                    if end < now:
-                        days_ago = (now - end).days
-                        if days_ago <= archive_duration_days:
-                            program_output["has_archive"] = 1  # INTEGER
-                            archive_count += 1
-
-                    output['epg_listings'].append(program_output)
+                        "now_playing": 0 if start_ts > now_ts or end_ts < now_ts else 1,
+                        "has_archive": has_archive,
+                    })
 
                 if debug:
                     logger.info(f"[Timeshift] EPG: Generated {len(output['epg_listings'])} programs ({archive_count} with archive) for {channel.name}")
@@ -606,13 +912,11 @@ def _patch_xc_get_epg():
                 if debug:
                     logger.info(f"[Timeshift] EPG: Delegating to original (tv_archive={has_tv_archive}, short={short})")
 
-                from django.http import QueryDict
                 original_get = request.GET
 
-                # Create a mutable copy and update stream_id to internal ID
-                new_get = original_get.copy()
-                new_get['stream_id'] = str(channel.id)
-                request.GET = new_get
+                # Override stream_id with the internal ID without copying the
+                # whole QueryDict (see _GETOverride)
+                request.GET = _GETOverride(original_get, {'stream_id': str(channel.id)})
 
                 try:
                     result = _original_xc_get_epg(request, user, short)
@@ -648,21 +952,38 @@ def _patch_generate_epg():
 
     _original_generate_epg = output_views.generate_epg
 
-    def patched_generate_epg(request, profile_name=None, user=None):
+    def patched_generate_epg(request, profile_name=None, user=None,
+                             _enabled=_is_plugin_enabled):
         # If plugin is disabled, use original function
-        if not _is_plugin_enabled():
+        if not _enabled():
             return _original_generate_epg(request, profile_name, user)
 
         try:
-            from zoneinfo import ZoneInfo
-            from django.http import StreamingHttpResponse
-            import re
-
             # Get timezone from plugin settings
             plugin_config = _get_plugin_config()
             timezone_str = plugin_config['timezone']
             debug = plugin_config['debug_mode']
-            local_tz = ZoneInfo(timezone_str)
+            local_tz = _zi(timezone_str)
+
+            # If the configured timezone has a zero UTC offset across the
+            # whole feed horizon (e.g. 'UTC', or a fixed +00:00 zone),
+            # every substitution would reproduce its input - skip the
+            # per-chunk regex scanning and return the response untouched.
+            # Checking only "now" is not enough: XMLTV feeds carry up to
+            # ~two weeks of future programmes (plus past days for
+            # catch-up), and for zones like Europe/London the weeks
+            # around a DST transition mix +0000 and +0100 timestamps in
+            # one feed. Probing both ends of the horizon keeps those
+            # feeds on the conversion path.
+            now = datetime.now(local_tz)
+            zero = timedelta(0)
+            horizon = timedelta(days=14)
+            if (now.utcoffset() == zero
+                    and (now - horizon).astimezone(local_tz).utcoffset() == zero
+                    and (now + horizon).astimezone(local_tz).utcoffset() == zero):
+                if debug:
+                    logger.info(f"[Timeshift] XMLTV: {timezone_str} offset is +0000, passing feed through unchanged")
+                return _original_generate_epg(request, profile_name, user)
 
             if debug:
                 logger.info(f"[Timeshift] XMLTV: Converting timestamps to {timezone_str}")
@@ -670,45 +991,56 @@ def _patch_generate_epg():
             # Call original function to get response
             original_response = _original_generate_epg(request, profile_name, user)
 
-            # Pattern to match XMLTV timestamps: 20251128143000 +0000
-            timestamp_pattern = re.compile(r'(\d{14}) ([+-]\d{4})')
-
-            # Handle both StreamingHttpResponse and regular HttpResponse
+            # Handle both StreamingHttpResponse and regular HttpResponse.
+            # We work on BYTES end to end: the upstream chunks are bytes, the
+            # output is bytes, and a bytes regex avoids a decode/encode pass
+            # over the whole (multi-MB) XMLTV document.
             if hasattr(original_response, 'streaming_content'):
                 # StreamingHttpResponse - use generator
                 original_generator = original_response.streaming_content
             else:
                 # Regular HttpResponse - convert content to single-item generator
-                content = original_response.content
-                if isinstance(content, bytes):
-                    content = content.decode('utf-8')
-                original_generator = iter([content])
+                original_generator = iter([original_response.content])
+
+            # Conversion callback built ONCE per request (not per chunk).
+            # The actual conversion is the memoized _convert_xmltv_ts, so
+            # repeated timestamps cost a dict lookup instead of
+            # strptime/astimezone/strftime.
+            def convert_timestamp(match):
+                converted = _convert_xmltv_ts(match.group(1), timezone_str)
+                if converted is None:
+                    if debug:
+                        logger.info(f"[Timeshift] XMLTV: Timestamp conversion failed for '{match.group(1)!r}'")
+                    return match.group(0)
+                return converted
 
             def timezone_converting_generator():
-                from datetime import datetime
-
+                # Rolling boundary buffer: hold back any suffix that could be
+                # the start of a timestamp split across two chunks, so no
+                # timestamp is ever emitted unconverted. O(1) extra memory
+                # (tail is at most 19 bytes), O(N) work overall.
+                tail = b''
                 for chunk in original_generator:
-                    # Ensure chunk is string
-                    if isinstance(chunk, bytes):
-                        chunk = chunk.decode('utf-8')
-
-                    # Only process chunks with programme timestamps
-                    if 'start="' in chunk or 'stop="' in chunk:
-                        def convert_timestamp(match):
-                            timestamp_str = match.group(1)
-                            try:
-                                utc_time = datetime.strptime(timestamp_str, "%Y%m%d%H%M%S")
-                                utc_time = utc_time.replace(tzinfo=ZoneInfo("UTC"))
-                                local_time = utc_time.astimezone(local_tz)
-                                return local_time.strftime("%Y%m%d%H%M%S %z")
-                            except Exception as e:
-                                if debug:
-                                    logger.info(f"[Timeshift] XMLTV: Timestamp conversion failed for '{timestamp_str}': {e}")
-                                return match.group(0)
-
-                        chunk = timestamp_pattern.sub(convert_timestamp, chunk)
-
-                    yield chunk
+                    # Ensure chunk is bytes (str chunks are possible from
+                    # hand-built generators upstream)
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode('utf-8')
+
+                    buf = tail + chunk
+                    # Only the last ~24 bytes can contain a split candidate
+                    window = buf[-24:]
+                    if _XMLTV_TS_END_RE.search(window):
+                        cut = len(buf)  # ends on a complete timestamp
+                    else:
+                        partial = _XMLTV_TS_PARTIAL_RE.search(window)
+                        cut = len(buf) - (len(window) - partial.start()) if partial else len(buf)
+                    out, tail = buf[:cut], buf[cut:]
+
+                    if out:
+                        yield _XMLTV_TS_RE.sub(convert_timestamp, out)
+
+                if tail:
+                    yield _XMLTV_TS_RE.sub(convert_timestamp, tail)
 
             # Return new StreamingHttpResponse with converted timestamps
             response = StreamingHttpResponse(
@@ -762,24 +1094,74 @@ def _patch_url_resolver():
         r'(?P<stream_id>\d+)/(?P<timestamp>[\d\-:]+)/(?P<duration>\d+)\.ts$'
     )
 
+    def _parse_timeshift(path):
+        """
+        Fast-path parser for the fixed timeshift URL shape.
+
+        The URL structure is strictly /timeshift/a/b/digits/timestamp/digits.ts,
+        so a split + isdecimal validation is cheaper than walking the regex
+        NFA on every intercepted request. isdecimal, not isdigit: isdigit
+        also accepts superscripts like '²' which the regex \d rejects,
+        and the fast path's accepts bypass the regex safety net. Returns the
+        same dict as TIMESHIFT_PATTERN's groupdict() or None if the path
+        doesn't conform.
+        """
+        if path[:1] == '/':
+            path = path[1:]
+        parts = path.split('/')
+        if len(parts) != 6 or parts[0] != 'timeshift':
+            return None
+        username, password, stream_id, timestamp, last = parts[1:]
+        if not (username and password and last.endswith('.ts')):
+            return None
+        duration = last[:-3]
+        if not (stream_id.isdecimal() and duration.isdecimal()):
+            return None
+        # timestamp is digits plus '-' / ':' separators (regex: [\d\-:]+)
+        if not timestamp.replace('-', '').replace(':', '').isdecimal():
+            return None
+        return {
+            'username': username,
+            'password': password,
+            'stream_id': stream_id,
+            'timestamp': timestamp,
+            'duration': duration,
+        }
+
     _original_resolve = URLResolver.resolve
 
-    def patched_resolve(self, path):
+    # Bind hot names as locals of the closure so the common (non-timeshift)
+    # path avoids global lookups: it costs two string-slice compares + a call.
+    _orig = _original_resolve
+    _match = TIMESHIFT_PATTERN.match
+
+    def patched_resolve(self, path, _enabled=_is_plugin_enabled):
+        # Cheap prefix check FIRST - this runs for every HTTP request hitting
+        # Django, so anything that isn't a timeshift URL must bail immediately,
+        # before the enabled-check or any regex work.
+        if path[:11] != '/timeshift/' and path[:10] != 'timeshift/':
+            return _orig(self, path)
+
         # Only intercept if plugin is enabled
-        if _is_plugin_enabled() and (path.startswith('/timeshift/') or path.startswith('timeshift/')):
-            match = TIMESHIFT_PATTERN.match(path)
-            if match:
-                from django.urls import ResolverMatch
+        if _enabled():
+            # Specialized split-based parser first; regex only as a safety
+            # net in case the two ever disagree on an edge case
+            kwargs = _parse_timeshift(path)
+            if kwargs is None:
+                match = _match(path)
+                if match:
+                    kwargs = match.groupdict()
+            if kwargs is not None:
                 config = _get_plugin_config()
                 if config['debug_mode']:
                     logger.info(f"[Timeshift] URL intercepted: {path}")
                 return ResolverMatch(
                     timeshift_proxy,
                     (),
-                    match.groupdict(),
+                    kwargs,
                     route=path,
                 )
-        return _original_resolve(self, path)
+        return _orig(self, path)
 
     URLResolver.resolve = patched_resolve
     logger.info("[Timeshift] Patched URLResolver.resolve")
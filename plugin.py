@@ -17,34 +17,353 @@ AUTO-INSTALL ON STARTUP:
     in EACH worker independently.
 """
 
-import logging
+import json
+import threading
 
-logger = logging.getLogger("plugins.dispatcharr_timeshift")
+import django
+from django.core.signals import request_finished
 
-# Track if hooks are installed in THIS worker (each uWSGI worker is separate)
+# Safe at module scope: hooks.py only imports stdlib at import time, so
+# there is no circular-import risk and callers skip the per-call
+# sys.modules lookup.
+from .hooks import install_hooks
+
+
+def _resolve_logger():
+    """
+    Materialize the real logger and rebind the module-level shortcuts.
+
+    Until the first log call this module never touches the logging
+    subsystem; afterwards `logger`, `_info` and `_error` are the real
+    logger and its pre-resolved bound methods, so log sites are direct
+    calls from then on.
+    """
+    global logger, _info, _error
+    import logging
+    logger = logging.getLogger("plugins.dispatcharr_timeshift")
+    _info = logger.info
+    _error = logger.error
+    return logger
+
+
+class _LazyLogger:
+    """Import-time stand-in; first attribute access swaps in the real logger."""
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        return getattr(_resolve_logger(), name)
+
+
+logger = _LazyLogger()
+
+
+def _info(*args, **kwargs):
+    _resolve_logger().info(*args, **kwargs)
+
+
+def _error(*args, **kwargs):
+    _resolve_logger().error(*args, **kwargs)
+
+# Track if hooks are installed in THIS worker (each uWSGI worker is separate).
+# The lock guards against two uWSGI worker THREADS racing past the flag check
+# and running install_hooks() twice in the same process.
 _hooks_installed = False
+_install_lock = threading.Lock()
+
+
+def _noop_install():
+    """Replacement for _auto_install_hooks once install has succeeded."""
+
+
+def _on_first_request(sender, **kwargs):
+    """
+    request_finished fallback when Django isn't ready at module import.
+
+    Module-level (no closure cell) and connected with weak=False so the
+    dispatcher calls it directly instead of dereferencing a weakref on
+    every warmup request; disconnects itself after the install runs.
+    """
+    _auto_install_hooks()
+    request_finished.disconnect(_on_first_request)
 
 
 def _auto_install_hooks():
     """
-    Install hooks automatically on Django startup.
+    Install hooks automatically on Django startup (thread-safe, one-shot).
 
     Hooks are ALWAYS installed, but they check _is_plugin_enabled() at runtime.
     This allows enabling/disabling the plugin without restart.
+
+    After a successful install the module global is rebound to a no-op, so
+    later calls (signal fallback, AppConfig.ready(), re-imports) cost a
+    single call into an empty function instead of flag checks.
     """
     global _hooks_installed
 
     if _hooks_installed:
         return
 
-    try:
-        from .hooks import install_hooks
-        if install_hooks():
-            _hooks_installed = True
-            logger.info("[Timeshift] Hooks installed (will check enabled state at runtime)")
+    with _install_lock:
+        # Double-checked: another thread may have finished the install
+        # while this one was waiting on the lock.
+        if _hooks_installed:
+            return
+
+        try:
+            if install_hooks():
+                _hooks_installed = True
+                globals()['_auto_install_hooks'] = _noop_install
+                _info("[Timeshift] Hooks installed (will check enabled state at runtime)")
+
+        except Exception as e:
+            _error("[Timeshift] Auto-install error: %s", e)
+
+
+# Plugin field metadata is static: build it ONCE at module import and share
+# the same tuple across every Plugin() instance (and, after uWSGI forks,
+# across workers via copy-on-write). Entries stay plain dicts/lists because
+# Dispatcharr serializes plugin fields to JSON for the settings UI and
+# read-only mapping proxies are not JSON-serializable.
+# Option tables for the select fields, shared by _FIELDS below. Tuples of
+# plain dicts: built once at import, never mutated, JSON-serializable.
+# Compact (tz, abbrev[, display]) rows; the full option dicts are built by
+# the comprehension below. Keeps ~120 near-duplicate string constants out
+# of the bytecode, shrinking the .pyc and its unmarshalling cost at worker
+# startup. 'display' is only set where the label name differs from the
+# zone name.
+_TZ_TABLE = (
+    # UTC
+    ("UTC", ""),
+    # Europe
+    ("Europe/Amsterdam", "CET"),
+    ("Europe/Andorra", "CET"),
+    ("Europe/Athens", "EET"),
+    ("Europe/Belgrade", "CET"),
+    ("Europe/Berlin", "CET"),
+    ("Europe/Bratislava", "CET"),
+    ("Europe/Brussels", "CET"),
+    ("Europe/Bucharest", "EET"),
+    ("Europe/Budapest", "CET"),
+    ("Europe/Chisinau", "EET"),
+    ("Europe/Copenhagen", "CET"),
+    ("Europe/Dublin", "GMT/IST"),
+    ("Europe/Gibraltar", "CET"),
+    ("Europe/Helsinki", "EET"),
+    ("Europe/Istanbul", "TRT"),
+    ("Europe/Kaliningrad", "EET"),
+    ("Europe/Kiev", "EET"),
+    ("Europe/Lisbon", "WET"),
+    ("Europe/Ljubljana", "CET"),
+    ("Europe/London", "GMT/BST"),
+    ("Europe/Luxembourg", "CET"),
+    ("Europe/Madrid", "CET"),
+    ("Europe/Malta", "CET"),
+    ("Europe/Minsk", "MSK"),
+    ("Europe/Monaco", "CET"),
+    ("Europe/Moscow", "MSK"),
+    ("Europe/Oslo", "CET"),
+    ("Europe/Paris", "CET"),
+    ("Europe/Podgorica", "CET"),
+    ("Europe/Prague", "CET"),
+    ("Europe/Riga", "EET"),
+    ("Europe/Rome", "CET"),
+    ("Europe/Samara", "SAMT"),
+    ("Europe/San_Marino", "CET"),
+    ("Europe/Sarajevo", "CET"),
+    ("Europe/Simferopol", "MSK"),
+    ("Europe/Skopje", "CET"),
+    ("Europe/Sofia", "EET"),
+    ("Europe/Stockholm", "CET"),
+    ("Europe/Tallinn", "EET"),
+    ("Europe/Tirane", "CET"),
+    ("Europe/Vaduz", "CET"),
+    ("Europe/Vatican", "CET"),
+    ("Europe/Vienna", "CET"),
+    ("Europe/Vilnius", "EET"),
+    ("Europe/Volgograd", "MSK"),
+    ("Europe/Warsaw", "CET"),
+    ("Europe/Zagreb", "CET"),
+    ("Europe/Zurich", "CET"),
+    # America
+    ("America/Anchorage", "AKST"),
+    ("America/Argentina/Buenos_Aires", "ART", "America/Buenos_Aires"),
+    ("America/Bogota", "COT"),
+    ("America/Caracas", "VET"),
+    ("America/Chicago", "CST"),
+    ("America/Denver", "MST"),
+    ("America/Halifax", "AST"),
+    ("America/Havana", "CST"),
+    ("America/Lima", "PET"),
+    ("America/Los_Angeles", "PST"),
+    ("America/Mexico_City", "CST"),
+    ("America/Montreal", "EST"),
+    ("America/New_York", "EST"),
+    ("America/Panama", "EST"),
+    ("America/Phoenix", "MST"),
+    ("America/Santiago", "CLT"),
+    ("America/Sao_Paulo", "BRT"),
+    ("America/St_Johns", "NST"),
+    ("America/Toronto", "EST"),
+    ("America/Vancouver", "PST"),
+    # Asia
+    ("Asia/Almaty", "ALMT"),
+    ("Asia/Amman", "EET"),
+    ("Asia/Baghdad", "AST"),
+    ("Asia/Baku", "AZT"),
+    ("Asia/Bangkok", "ICT"),
+    ("Asia/Beirut", "EET"),
+    ("Asia/Colombo", "IST"),
+    ("Asia/Damascus", "EET"),
+    ("Asia/Dhaka", "BST"),
+    ("Asia/Dubai", "GST"),
+    ("Asia/Ho_Chi_Minh", "ICT"),
+    ("Asia/Hong_Kong", "HKT"),
+    ("Asia/Jakarta", "WIB"),
+    ("Asia/Jerusalem", "IST"),
+    ("Asia/Kabul", "AFT"),
+    ("Asia/Karachi", "PKT"),
+    ("Asia/Kathmandu", "NPT"),
+    ("Asia/Kolkata", "IST"),
+    ("Asia/Kuala_Lumpur", "MYT"),
+    ("Asia/Kuwait", "AST"),
+    ("Asia/Manila", "PHT"),
+    ("Asia/Muscat", "GST"),
+    ("Asia/Nicosia", "EET"),
+    ("Asia/Qatar", "AST"),
+    ("Asia/Riyadh", "AST"),
+    ("Asia/Seoul", "KST"),
+    ("Asia/Shanghai", "CST"),
+    ("Asia/Singapore", "SGT"),
+    ("Asia/Taipei", "CST"),
+    ("Asia/Tashkent", "UZT"),
+    ("Asia/Tehran", "IRST"),
+    ("Asia/Tokyo", "JST"),
+    ("Asia/Yekaterinburg", "YEKT"),
+    # Africa
+    ("Africa/Algiers", "CET"),
+    ("Africa/Cairo", "EET"),
+    ("Africa/Casablanca", "WET"),
+    ("Africa/Johannesburg", "SAST"),
+    ("Africa/Lagos", "WAT"),
+    ("Africa/Nairobi", "EAT"),
+    ("Africa/Tunis", "CET"),
+    # Australia & Pacific
+    ("Australia/Adelaide", "ACST"),
+    ("Australia/Brisbane", "AEST"),
+    ("Australia/Darwin", "ACST"),
+    ("Australia/Hobart", "AEST"),
+    ("Australia/Melbourne", "AEST"),
+    ("Australia/Perth", "AWST"),
+    ("Australia/Sydney", "AEST"),
+    ("Pacific/Auckland", "NZST"),
+    ("Pacific/Fiji", "FJT"),
+    ("Pacific/Honolulu", "HST"),
+)
+
+def _tz_option(row):
+    tz, abbr = row[0], row[1]
+    display = row[2] if len(row) > 2 else tz
+    return {"value": tz, "label": f"{display} ({abbr})" if abbr else display}
+
+
+_TIMEZONE_OPTIONS = tuple(_tz_option(row) for row in _TZ_TABLE)
 
-    except Exception as e:
-        logger.error(f"[Timeshift] Auto-install error: {e}")
+_LANGUAGE_OPTIONS = (
+    {"value": "bg", "label": "Български (Bulgarian)"},
+    {"value": "cs", "label": "Čeština (Czech)"},
+    {"value": "da", "label": "Dansk (Danish)"},
+    {"value": "de", "label": "Deutsch"},
+    {"value": "el", "label": "Ελληνικά (Greek)"},
+    {"value": "en", "label": "English"},
+    {"value": "es", "label": "Español"},
+    {"value": "et", "label": "Eesti (Estonian)"},
+    {"value": "fi", "label": "Suomi (Finnish)"},
+    {"value": "fr", "label": "Français"},
+    {"value": "hr", "label": "Hrvatski (Croatian)"},
+    {"value": "hu", "label": "Magyar (Hungarian)"},
+    {"value": "it", "label": "Italiano"},
+    {"value": "lt", "label": "Lietuvių (Lithuanian)"},
+    {"value": "lv", "label": "Latviešu (Latvian)"},
+    {"value": "nl", "label": "Nederlands"},
+    {"value": "no", "label": "Norsk (Norwegian)"},
+    {"value": "pl", "label": "Polski (Polish)"},
+    {"value": "pt", "label": "Português"},
+    {"value": "ro", "label": "Română (Romanian)"},
+    {"value": "ru", "label": "Русский (Russian)"},
+    {"value": "sk", "label": "Slovenčina (Slovak)"},
+    {"value": "sl", "label": "Slovenščina (Slovenian)"},
+    {"value": "sr", "label": "Српски (Serbian)"},
+    {"value": "sv", "label": "Svenska (Swedish)"},
+    {"value": "tr", "label": "Türkçe (Turkish)"},
+    {"value": "uk", "label": "Українська (Ukrainian)"},
+)
+
+_FIELDS = (
+    {
+        "id": "timezone",
+        "type": "select",
+        "label": "Provider Timezone",
+        "default": "Europe/Brussels",
+        "options": _TIMEZONE_OPTIONS,
+        "help_text": "Timezone for timestamp conversion (must match your XC provider's timezone)"
+    },
+    {
+        "id": "language",
+        "type": "select",
+        "label": "EPG Language",
+        "default": "en",
+        "options": _LANGUAGE_OPTIONS,
+        "help_text": "Language code for EPG data (ISO 639-1)"
+    },
+    {
+        "id": "debug_mode",
+        "type": "boolean",
+        "label": "Debug Mode",
+        "default": False,
+        "help_text": "Enable ultra-verbose logging for troubleshooting (check Dispatcharr logs)"
+    },
+    {
+        "id": "url_format",
+        "type": "select",
+        "label": "Catchup URL Format",
+        "default": "auto",
+        "options": [
+            {"value": "auto", "label": "Auto-detect (A → B fallback)"},
+            {"value": "format_a", "label": "Format A (query string: timeshift.php?...)"},
+            {"value": "format_b", "label": "Format B (path: /timeshift/user/pass/...)"},
+            {"value": "custom", "label": "Custom template"}
+        ],
+        "help_text": "URL format for timeshift requests. Auto-detect works for most providers."
+    },
+    {
+        "id": "custom_url_template",
+        "type": "string",
+        "label": "Custom URL Template",
+        "default": "",
+        "help_text": "Only used when 'Custom template' is selected. Placeholders: {server_url}, {username}, {password}, {stream_id}, {timestamp}, {duration}"
+    },
+    {
+        "id": "nginx_accel",
+        "type": "boolean",
+        "label": "nginx X-Accel-Redirect Offload",
+        "default": False,
+        "help_text": "Stream via nginx instead of Python (requires the /internal_ts/ nginx location from the README)"
+    }
+)
+
+# No custom actions needed
+_EMPTY_ACTIONS = ()
+
+
+# Lazily built by Plugin.fields_json.
+_FIELDS_JSON = None
+
+# Canned run() responses, allocated once. Plain dicts (not mapping proxies)
+# because PluginManager JSON-serializes action results; callers are expected
+# to treat them as read-only.
+_RESP_ENABLED = {"status": "ok", "message": "Timeshift plugin enabled"}
+_RESP_DISABLED = {"status": "ok", "message": "Timeshift plugin disabled"}
+_RESP_INSTALL_FAIL = {"status": "error", "message": "Failed to install hooks"}
 
 
 class Plugin:
@@ -55,6 +374,12 @@ class Plugin:
     when the plugin is toggled in the UI.
     """
 
+    # No per-instance __dict__: the metadata attributes are fixed and
+    # fields/actions are properties over shared module constants, so slots
+    # cut the instance to a few C-level offsets.
+    __slots__ = ("name", "version", "description", "url",
+                 "author", "author_url")
+
     def __init__(self):
         self.name = "Dispatcharr Timeshift"
         self.version = "1.1.9"
@@ -63,209 +388,50 @@ class Plugin:
         self.author = "Cedric Marcoux"
         self.author_url = "https://github.com/cedric-marcoux"
 
-        self.fields = [
-            {
-                "id": "timezone",
-                "type": "select",
-                "label": "Provider Timezone",
-                "default": "Europe/Brussels",
-                "options": [
-                    # UTC
-                    {"value": "UTC", "label": "UTC"},
-                    # Europe
-                    {"value": "Europe/Amsterdam", "label": "Europe/Amsterdam (CET)"},
-                    {"value": "Europe/Andorra", "label": "Europe/Andorra (CET)"},
-                    {"value": "Europe/Athens", "label": "Europe/Athens (EET)"},
-                    {"value": "Europe/Belgrade", "label": "Europe/Belgrade (CET)"},
-                    {"value": "Europe/Berlin", "label": "Europe/Berlin (CET)"},
-                    {"value": "Europe/Bratislava", "label": "Europe/Bratislava (CET)"},
-                    {"value": "Europe/Brussels", "label": "Europe/Brussels (CET)"},
-                    {"value": "Europe/Bucharest", "label": "Europe/Bucharest (EET)"},
-                    {"value": "Europe/Budapest", "label": "Europe/Budapest (CET)"},
-                    {"value": "Europe/Chisinau", "label": "Europe/Chisinau (EET)"},
-                    {"value": "Europe/Copenhagen", "label": "Europe/Copenhagen (CET)"},
-                    {"value": "Europe/Dublin", "label": "Europe/Dublin (GMT/IST)"},
-                    {"value": "Europe/Gibraltar", "label": "Europe/Gibraltar (CET)"},
-                    {"value": "Europe/Helsinki", "label": "Europe/Helsinki (EET)"},
-                    {"value": "Europe/Istanbul", "label": "Europe/Istanbul (TRT)"},
-                    {"value": "Europe/Kaliningrad", "label": "Europe/Kaliningrad (EET)"},
-                    {"value": "Europe/Kiev", "label": "Europe/Kiev (EET)"},
-                    {"value": "Europe/Lisbon", "label": "Europe/Lisbon (WET)"},
-                    {"value": "Europe/Ljubljana", "label": "Europe/Ljubljana (CET)"},
-                    {"value": "Europe/London", "label": "Europe/London (GMT/BST)"},
-                    {"value": "Europe/Luxembourg", "label": "Europe/Luxembourg (CET)"},
-                    {"value": "Europe/Madrid", "label": "Europe/Madrid (CET)"},
-                    {"value": "Europe/Malta", "label": "Europe/Malta (CET)"},
-                    {"value": "Europe/Minsk", "label": "Europe/Minsk (MSK)"},
-                    {"value": "Europe/Monaco", "label": "Europe/Monaco (CET)"},
-                    {"value": "Europe/Moscow", "label": "Europe/Moscow (MSK)"},
-                    {"value": "Europe/Oslo", "label": "Europe/Oslo (CET)"},
-                    {"value": "Europe/Paris", "label": "Europe/Paris (CET)"},
-                    {"value": "Europe/Podgorica", "label": "Europe/Podgorica (CET)"},
-                    {"value": "Europe/Prague", "label": "Europe/Prague (CET)"},
-                    {"value": "Europe/Riga", "label": "Europe/Riga (EET)"},
-                    {"value": "Europe/Rome", "label": "Europe/Rome (CET)"},
-                    {"value": "Europe/Samara", "label": "Europe/Samara (SAMT)"},
-                    {"value": "Europe/San_Marino", "label": "Europe/San_Marino (CET)"},
-                    {"value": "Europe/Sarajevo", "label": "Europe/Sarajevo (CET)"},
-                    {"value": "Europe/Simferopol", "label": "Europe/Simferopol (MSK)"},
-                    {"value": "Europe/Skopje", "label": "Europe/Skopje (CET)"},
-                    {"value": "Europe/Sofia", "label": "Europe/Sofia (EET)"},
-                    {"value": "Europe/Stockholm", "label": "Europe/Stockholm (CET)"},
-                    {"value": "Europe/Tallinn", "label": "Europe/Tallinn (EET)"},
-                    {"value": "Europe/Tirane", "label": "Europe/Tirane (CET)"},
-                    {"value": "Europe/Vaduz", "label": "Europe/Vaduz (CET)"},
-                    {"value": "Europe/Vatican", "label": "Europe/Vatican (CET)"},
-                    {"value": "Europe/Vienna", "label": "Europe/Vienna (CET)"},
-                    {"value": "Europe/Vilnius", "label": "Europe/Vilnius (EET)"},
-                    {"value": "Europe/Volgograd", "label": "Europe/Volgograd (MSK)"},
-                    {"value": "Europe/Warsaw", "label": "Europe/Warsaw (CET)"},
-                    {"value": "Europe/Zagreb", "label": "Europe/Zagreb (CET)"},
-                    {"value": "Europe/Zurich", "label": "Europe/Zurich (CET)"},
-                    # America
-                    {"value": "America/Anchorage", "label": "America/Anchorage (AKST)"},
-                    {"value": "America/Argentina/Buenos_Aires", "label": "America/Buenos_Aires (ART)"},
-                    {"value": "America/Bogota", "label": "America/Bogota (COT)"},
-                    {"value": "America/Caracas", "label": "America/Caracas (VET)"},
-                    {"value": "America/Chicago", "label": "America/Chicago (CST)"},
-                    {"value": "America/Denver", "label": "America/Denver (MST)"},
-                    {"value": "America/Halifax", "label": "America/Halifax (AST)"},
-                    {"value": "America/Havana", "label": "America/Havana (CST)"},
-                    {"value": "America/Lima", "label": "America/Lima (PET)"},
-                    {"value": "America/Los_Angeles", "label": "America/Los_Angeles (PST)"},
-                    {"value": "America/Mexico_City", "label": "America/Mexico_City (CST)"},
-                    {"value": "America/Montreal", "label": "America/Montreal (EST)"},
-                    {"value": "America/New_York", "label": "America/New_York (EST)"},
-                    {"value": "America/Panama", "label": "America/Panama (EST)"},
-                    {"value": "America/Phoenix", "label": "America/Phoenix (MST)"},
-                    {"value": "America/Santiago", "label": "America/Santiago (CLT)"},
-                    {"value": "America/Sao_Paulo", "label": "America/Sao_Paulo (BRT)"},
-                    {"value": "America/St_Johns", "label": "America/St_Johns (NST)"},
-                    {"value": "America/Toronto", "label": "America/Toronto (EST)"},
-                    {"value": "America/Vancouver", "label": "America/Vancouver (PST)"},
-                    # Asia
-                    {"value": "Asia/Almaty", "label": "Asia/Almaty (ALMT)"},
-                    {"value": "Asia/Amman", "label": "Asia/Amman (EET)"},
-                    {"value": "Asia/Baghdad", "label": "Asia/Baghdad (AST)"},
-                    {"value": "Asia/Baku", "label": "Asia/Baku (AZT)"},
-                    {"value": "Asia/Bangkok", "label": "Asia/Bangkok (ICT)"},
-                    {"value": "Asia/Beirut", "label": "Asia/Beirut (EET)"},
-                    {"value": "Asia/Colombo", "label": "Asia/Colombo (IST)"},
-                    {"value": "Asia/Damascus", "label": "Asia/Damascus (EET)"},
-                    {"value": "Asia/Dhaka", "label": "Asia/Dhaka (BST)"},
-                    {"value": "Asia/Dubai", "label": "Asia/Dubai (GST)"},
-                    {"value": "Asia/Ho_Chi_Minh", "label": "Asia/Ho_Chi_Minh (ICT)"},
-                    {"value": "Asia/Hong_Kong", "label": "Asia/Hong_Kong (HKT)"},
-                    {"value": "Asia/Jakarta", "label": "Asia/Jakarta (WIB)"},
-                    {"value": "Asia/Jerusalem", "label": "Asia/Jerusalem (IST)"},
-                    {"value": "Asia/Kabul", "label": "Asia/Kabul (AFT)"},
-                    {"value": "Asia/Karachi", "label": "Asia/Karachi (PKT)"},
-                    {"value": "Asia/Kathmandu", "label": "Asia/Kathmandu (NPT)"},
-                    {"value": "Asia/Kolkata", "label": "Asia/Kolkata (IST)"},
-                    {"value": "Asia/Kuala_Lumpur", "label": "Asia/Kuala_Lumpur (MYT)"},
-                    {"value": "Asia/Kuwait", "label": "Asia/Kuwait (AST)"},
-                    {"value": "Asia/Manila", "label": "Asia/Manila (PHT)"},
-                    {"value": "Asia/Muscat", "label": "Asia/Muscat (GST)"},
-                    {"value": "Asia/Nicosia", "label": "Asia/Nicosia (EET)"},
-                    {"value": "Asia/Qatar", "label": "Asia/Qatar (AST)"},
-                    {"value": "Asia/Riyadh", "label": "Asia/Riyadh (AST)"},
-                    {"value": "Asia/Seoul", "label": "Asia/Seoul (KST)"},
-                    {"value": "Asia/Shanghai", "label": "Asia/Shanghai (CST)"},
-                    {"value": "Asia/Singapore", "label": "Asia/Singapore (SGT)"},
-                    {"value": "Asia/Taipei", "label": "Asia/Taipei (CST)"},
-                    {"value": "Asia/Tashkent", "label": "Asia/Tashkent (UZT)"},
-                    {"value": "Asia/Tehran", "label": "Asia/Tehran (IRST)"},
-                    {"value": "Asia/Tokyo", "label": "Asia/Tokyo (JST)"},
-                    {"value": "Asia/Yekaterinburg", "label": "Asia/Yekaterinburg (YEKT)"},
-                    # Africa
-                    {"value": "Africa/Algiers", "label": "Africa/Algiers (CET)"},
-                    {"value": "Africa/Cairo", "label": "Africa/Cairo (EET)"},
-                    {"value": "Africa/Casablanca", "label": "Africa/Casablanca (WET)"},
-                    {"value": "Africa/Johannesburg", "label": "Africa/Johannesburg (SAST)"},
-                    {"value": "Africa/Lagos", "label": "Africa/Lagos (WAT)"},
-                    {"value": "Africa/Nairobi", "label": "Africa/Nairobi (EAT)"},
-                    {"value": "Africa/Tunis", "label": "Africa/Tunis (CET)"},
-                    # Australia & Pacific
-                    {"value": "Australia/Adelaide", "label": "Australia/Adelaide (ACST)"},
-                    {"value": "Australia/Brisbane", "label": "Australia/Brisbane (AEST)"},
-                    {"value": "Australia/Darwin", "label": "Australia/Darwin (ACST)"},
-                    {"value": "Australia/Hobart", "label": "Australia/Hobart (AEST)"},
-                    {"value": "Australia/Melbourne", "label": "Australia/Melbourne (AEST)"},
-                    {"value": "Australia/Perth", "label": "Australia/Perth (AWST)"},
-                    {"value": "Australia/Sydney", "label": "Australia/Sydney (AEST)"},
-                    {"value": "Pacific/Auckland", "label": "Pacific/Auckland (NZST)"},
-                    {"value": "Pacific/Fiji", "label": "Pacific/Fiji (FJT)"},
-                    {"value": "Pacific/Honolulu", "label": "Pacific/Honolulu (HST)"},
-                ],
-                "help_text": "Timezone for timestamp conversion (must match your XC provider's timezone)"
-            },
-            {
-                "id": "language",
-                "type": "select",
-                "label": "EPG Language",
-                "default": "en",
-                "options": [
-                    {"value": "bg", "label": "Български (Bulgarian)"},
-                    {"value": "cs", "label": "Čeština (Czech)"},
-                    {"value": "da", "label": "Dansk (Danish)"},
-                    {"value": "de", "label": "Deutsch"},
-                    {"value": "el", "label": "Ελληνικά (Greek)"},
-                    {"value": "en", "label": "English"},
-                    {"value": "es", "label": "Español"},
-                    {"value": "et", "label": "Eesti (Estonian)"},
-                    {"value": "fi", "label": "Suomi (Finnish)"},
-                    {"value": "fr", "label": "Français"},
-                    {"value": "hr", "label": "Hrvatski (Croatian)"},
-                    {"value": "hu", "label": "Magyar (Hungarian)"},
-                    {"value": "it", "label": "Italiano"},
-                    {"value": "lt", "label": "Lietuvių (Lithuanian)"},
-                    {"value": "lv", "label": "Latviešu (Latvian)"},
-                    {"value": "nl", "label": "Nederlands"},
-                    {"value": "no", "label": "Norsk (Norwegian)"},
-                    {"value": "pl", "label": "Polski (Polish)"},
-                    {"value": "pt", "label": "Português"},
-                    {"value": "ro", "label": "Română (Romanian)"},
-                    {"value": "ru", "label": "Русский (Russian)"},
-                    {"value": "sk", "label": "Slovenčina (Slovak)"},
-                    {"value": "sl", "label": "Slovenščina (Slovenian)"},
-                    {"value": "sr", "label": "Српски (Serbian)"},
-                    {"value": "sv", "label": "Svenska (Swedish)"},
-                    {"value": "tr", "label": "Türkçe (Turkish)"},
-                    {"value": "uk", "label": "Українська (Ukrainian)"},
-                ],
-                "help_text": "Language code for EPG data (ISO 639-1)"
-            },
-            {
-                "id": "debug_mode",
-                "type": "boolean",
-                "label": "Debug Mode",
-                "default": False,
-                "help_text": "Enable ultra-verbose logging for troubleshooting (check Dispatcharr logs)"
-            },
-            {
-                "id": "url_format",
-                "type": "select",
-                "label": "Catchup URL Format",
-                "default": "auto",
-                "options": [
-                    {"value": "auto", "label": "Auto-detect (A → B fallback)"},
-                    {"value": "format_a", "label": "Format A (query string: timeshift.php?...)"},
-                    {"value": "format_b", "label": "Format B (path: /timeshift/user/pass/...)"},
-                    {"value": "custom", "label": "Custom template"}
-                ],
-                "help_text": "URL format for timeshift requests. Auto-detect works for most providers."
-            },
-            {
-                "id": "custom_url_template",
-                "type": "string",
-                "label": "Custom URL Template",
-                "default": "",
-                "help_text": "Only used when 'Custom template' is selected. Placeholders: {server_url}, {username}, {password}, {stream_id}, {timestamp}, {duration}"
-            }
-        ]
+    @property
+    def fields(self):
+        # Only the settings UI reads field metadata; resolve it lazily so
+        # the request path never touches it. Plain property (slots have no
+        # __dict__ for cached_property) returning the shared module tuple:
+        # no per-instance cache needed because nothing is computed here.
+        return _FIELDS
 
+    @property
+    def actions(self):
         # No custom actions needed
-        self.actions = []
+        return _EMPTY_ACTIONS
+
+    @property
+    def fields_json(self):
+        """
+        Pre-serialized JSON bytes for the field metadata.
+
+        Consumers that only need the serialized form (e.g. an admin
+        endpoint answering with HttpResponse(plugin.fields_json,
+        content_type="application/json")) can return these cached bytes
+        instead of re-walking the 150-entry structure per page load.
+        Built lazily on first access and shared by all instances.
+        """
+        global _FIELDS_JSON
+        if _FIELDS_JSON is None:
+            _FIELDS_JSON = json.dumps(_FIELDS, separators=(",", ":")).encode("utf-8")
+        return _FIELDS_JSON
+
+    def _enable(self, params, context):
+        _info("[Timeshift] Enabling plugin...")
+        if install_hooks():
+            return _RESP_ENABLED
+        return _RESP_INSTALL_FAIL
+
+    def _disable(self, params, context):
+        # Note: Dispatcharr only toggles the 'enabled' flag in DB, it doesn't call this.
+        # Hooks remain installed and check enabled state at runtime.
+        _info("[Timeshift] Plugin disabled (hooks check enabled state at runtime)")
+        return _RESP_DISABLED
+
+    # Action dispatch table: O(1) lookup instead of chained string compares,
+    # and the "Unknown action" f-string is only built on the error path.
+    _ACTIONS = {"enable": _enable, "disable": _disable}
 
     def run(self, action=None, params=None, context=None):
         """
@@ -275,38 +441,20 @@ class Plugin:
         - action="enable": Plugin is being enabled
         - action="disable": Plugin is being disabled
         """
-        context = context or {}
-
-        if action == "enable":
-            logger.info("[Timeshift] Enabling plugin...")
-            from .hooks import install_hooks
-            if install_hooks():
-                return {"status": "ok", "message": "Timeshift plugin enabled"}
-            return {"status": "error", "message": "Failed to install hooks"}
-
-        elif action == "disable":
-            # Note: Dispatcharr only toggles the 'enabled' flag in DB, it doesn't call this.
-            # Hooks remain installed and check enabled state at runtime.
-            logger.info("[Timeshift] Plugin disabled (hooks check enabled state at runtime)")
-            return {"status": "ok", "message": "Timeshift plugin disabled"}
-
-        return {"status": "error", "message": f"Unknown action: {action}"}
+        handler = self._ACTIONS.get(action)
+        if handler is None:
+            return {"status": "error", "message": f"Unknown action: {action}"}
+        return handler(self, params, context)
 
 
 # Auto-install hooks when this module is imported (on Django startup)
-# This runs once per uWSGI worker when PluginManager discovers this plugin
-try:
-    import django
-    if django.apps.apps.ready:
-        _auto_install_hooks()
-    else:
-        # Django not ready yet, use signal to install on first request
-        from django.core.signals import request_finished
-
-        def _on_first_request(sender, **kwargs):
-            _auto_install_hooks()
-            request_finished.disconnect(_on_first_request)
-
-        request_finished.connect(_on_first_request)
-except Exception:
-    pass
+# This runs once per uWSGI worker when PluginManager discovers this plugin.
+# No blanket try/except here: django is a hard dependency of the host
+# application, _auto_install_hooks() already contains its own error
+# handling, and swallowing everything silently used to hide real startup
+# errors.
+if django.apps.apps.ready:
+    _auto_install_hooks()
+else:
+    # Django not ready yet, use signal to install on first request
+    request_finished.connect(_on_first_request, weak=False)
@@ -31,18 +31,200 @@ AUTHENTICATION:
 GitHub: https://github.com/cedric-marcoux/dispatcharr_timeshift
 """
 
+import bisect
+import functools
+import hashlib
 import logging
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import quote, urlencode
 from zoneinfo import ZoneInfo
-from django.http import StreamingHttpResponse, Http404, HttpResponseBadRequest, HttpResponseForbidden
+from requests.adapters import HTTPAdapter
+from django.core.cache import cache as django_cache
+from django.utils.crypto import constant_time_compare
+from django.http import HttpResponse, StreamingHttpResponse, Http404, HttpResponseBadRequest, HttpResponseForbidden
 
 logger = logging.getLogger("plugins.dispatcharr_timeshift.views")
 
+# Only the view itself is public API; everything else in this module is an
+# implementation detail of the proxy.
+__all__ = ['timeshift_proxy']
+
+# One pooled session for all provider requests. Keep-alive amortizes the
+# TCP/TLS handshake across playback starts and across the Format A->B
+# fallback retry (TLS session resumption); max_retries=0 because the view
+# has its own fallback logic and a retrying adapter would double the
+# latency of genuine provider errors.
+_SESSION = requests.Session()
+for _scheme in ('http://', 'https://'):
+    _SESSION.mount(_scheme, HTTPAdapter(
+        pool_connections=32, pool_maxsize=128, max_retries=0
+    ))
+del _scheme
+
+# Memoized ZoneInfo lookup shared with the hooks module (safe to import at
+# module scope: hooks.py only pulls stdlib at import time).
+from .hooks import _zi
+
+# UTC never changes; resolve it once instead of per request.
+_UTC = ZoneInfo("UTC")
+
+# TTL cache for _get_plugin_timezone so the per-request path doesn't pay a
+# PluginConfig query. 60s staleness is acceptable for a setting that
+# changes at most a few times ever.
+_TZ_CACHE = {'tz': 'Europe/Brussels', 'expires': 0.0}
+
+# UTC-offset cache for _convert_timestamp_to_local, keyed per timezone and
+# 15-minute UTC bucket. Every real-world UTC offset is a multiple of 15
+# minutes, so DST transitions always land on 15-minute UTC boundaries and
+# the offset is constant within a bucket; caching it turns the per-request
+# conversion into integer arithmetic instead of a tz database probe.
+_TZ_OFFSET_CACHE = {}
+
+# Short-TTL auth cache. IPTV clients re-enter timeshift_proxy for every
+# Range seek with the same credentials; memoizing the outcome for a minute
+# skips the User query on those storms. Keys are blake2b digests so no
+# plaintext credentials sit in memory; failures are cached too, which also
+# shields the DB from repeated bad-credential hits.
+_AUTH_CACHE = {}
+_AUTH_CACHE_LOCK = threading.Lock()
+_AUTH_TTL = 60.0
+_AUTH_CACHE_MAX = 4096
+
+
+# In-process programme index per epg_data_id, probed with bisect instead of
+# a per-request DB query. Entry: (starts, ends, loaded_at) where starts/ends
+# are parallel lists of epoch seconds sorted by start. Rebuilt lazily once
+# the entry is older than _EPG_INDEX_TTL; EPG data only changes on guide
+# refresh, so ten minutes of staleness is fine for duration estimates.
+_EPG_INDEX = {}
+_EPG_INDEX_LOCK = threading.Lock()
+_EPG_INDEX_TTL = 600.0
+
+
+def _epg_index_for(epg_data):
+    """
+    Return the (starts, ends, loaded_at) index for an EPGData row.
+
+    Builds or refreshes the cached entry as needed; returns None if the
+    programme table can't be read (caller falls back to a direct query).
+    """
+    now = time.monotonic()
+    entry = _EPG_INDEX.get(epg_data.id)
+    if entry is not None and now - entry[2] < _EPG_INDEX_TTL:
+        return entry
+
+    try:
+        starts = []
+        ends = []
+        rows = epg_data.programs.order_by('start_time').values_list(
+            'start_time', 'end_time'
+        ).iterator(chunk_size=2000)
+        for start_time, end_time in rows:
+            starts.append(start_time.timestamp())
+            ends.append(end_time.timestamp())
+        entry = (starts, ends, now)
+        with _EPG_INDEX_LOCK:
+            _EPG_INDEX[epg_data.id] = entry
+        return entry
+    except Exception as e:
+        logger.debug("[Timeshift] EPG index build failed for epg_data=%s: %s", epg_data.id, e)
+        return None
+
+
+class _AuthedUser:
+    """Lightweight stand-in exposing just what timeshift_proxy reads."""
+    __slots__ = ('id', 'user_level')
+
+    def __init__(self, user_id, user_level):
+        self.id = user_id
+        self.user_level = user_level
+
 # Cache for URL format preferences per m3u_account
 # Key: m3u_account.id, Value: 'A' (query string) or 'B' (path-based)
-# This is session-scoped (cleared on restart) - no persistence needed
+# Two layers: this in-process dict is an L1 (no backend round-trip on the
+# hot path) in front of Django's cache framework, which shares the learned
+# format across uWSGI workers and restarts when a Redis/memcached backend
+# is configured. With the default LocMemCache it degrades to per-process
+# behavior, same as before.
 _url_format_cache = {}
+_FORMAT_CACHE_TIMEOUT = 86400 * 30  # providers rarely change panel software
+
+
+def _get_preferred_format(m3u_account_id):
+    """Return the cached working URL format for an account ('A' default)."""
+    fmt = _url_format_cache.get(m3u_account_id)
+    if fmt is None:
+        try:
+            fmt = django_cache.get(f"ts_fmt:{m3u_account_id}")
+        except Exception:
+            fmt = None
+        if fmt is not None:
+            _url_format_cache[m3u_account_id] = fmt
+    return fmt or 'A'
+
+
+def _set_preferred_format(m3u_account_id, fmt):
+    """Record the working URL format in both cache layers."""
+    _url_format_cache[m3u_account_id] = fmt
+    try:
+        django_cache.set(f"ts_fmt:{m3u_account_id}", fmt, timeout=_FORMAT_CACHE_TIMEOUT)
+    except Exception:
+        pass
+
+
+# One background thread for first-contact format probes. The probe can
+# only CONFIRM Format A (see _probe_format); for Format-B panels the first
+# real request still pays the A attempt and learns 'B' from the observed
+# fallback, same as the baseline.
+_PROBE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ts_probe')
+_PROBED_ACCOUNTS = set()
+_PROBED_LOCK = threading.Lock()
+
+
+def _probe_format(m3u_account_id, server_url):
+    """
+    HEAD-probe .../streaming/timeshift.php to learn an account's URL format.
+
+    Panels that implement Format A answer the endpoint (2xx, or 401/403
+    without credentials); only that confirmation is cached. A 404 is NOT
+    persisted as 'B': plenty of Format-A panels and front proxies 404 a
+    credential-less HEAD, and a wrong 'B' entry would never self-correct -
+    'B' is served without a Format-A fallback, and the cache is only
+    rewritten when an A->B fallback succeeds, which can't happen from the
+    B path. A wrong 'A' is harmless (A is always tried with B fallback
+    and the cache fixes itself on the first real request), so 'B' is
+    still only ever learned by observing it actually stream.
+    """
+    try:
+        resp = _SESSION.head(
+            _server_base(server_url) + '/streaming/timeshift.php',
+            timeout=5, allow_redirects=True
+        )
+        status = resp.status_code
+        resp.close()
+        if status not in (200, 206, 401, 403):
+            logger.debug("[Timeshift] Format probe inconclusive for account %s (HEAD status %s)", m3u_account_id, status)
+            return
+        _set_preferred_format(m3u_account_id, 'A')
+        logger.info("[Timeshift] Probed URL format A for account %s (HEAD status %s)", m3u_account_id, status)
+    except Exception as e:
+        logger.debug("[Timeshift] Format probe failed for account %s: %s", m3u_account_id, e)
+
+
+def _schedule_format_probe(m3u_account):
+    """Queue a one-time background probe for an account with unknown format."""
+    with _PROBED_LOCK:
+        if m3u_account.id in _PROBED_ACCOUNTS:
+            return
+        _PROBED_ACCOUNTS.add(m3u_account.id)
+    try:
+        _PROBE_EXECUTOR.submit(_probe_format, m3u_account.id, m3u_account.server_url)
+    except RuntimeError:
+        pass  # executor shut down during interpreter exit
 
 
 def _get_programme_duration(channel, timestamp_str):
@@ -70,18 +252,39 @@ def _get_programme_duration(channel, timestamp_str):
         if not channel.epg_data:
             return DEFAULT_DURATION
 
-        # Find programme that contains this timestamp
-        # The timestamp is the programme start time from iPlayTV
-        programme = channel.epg_data.programs.filter(
+        # Interpret the naive timestamp the same way the ORM would (as the
+        # Django current timezone) before converting to epoch seconds.
+        from django.utils import timezone as django_timezone
+        if django_timezone.is_naive(dt):
+            dt = django_timezone.make_aware(dt)
+        ts = dt.timestamp()
+
+        # Probe the in-memory index first: O(log n) bisect, no DB traffic.
+        # The timestamp is the programme start time from iPlayTV, so the
+        # covering programme is the last one starting at or before it.
+        index = _epg_index_for(channel.epg_data)
+        if index is not None:
+            starts, ends, _loaded = index
+            i = bisect.bisect_right(starts, ts) - 1
+            if i < 0 or ends[i] <= ts:
+                return DEFAULT_DURATION
+            duration_minutes = int((ends[i] - starts[i]) / 60) + BUFFER_MINUTES
+            # Cap at reasonable maximum (8 hours) to avoid issues
+            return min(duration_minutes, 480)
+
+        # Index unavailable - fall back to the direct lookup. values_list
+        # skips Program model hydration: only the two datetimes cross the
+        # ORM boundary.
+        row = channel.epg_data.programs.filter(
             start_time__lte=dt,
             end_time__gt=dt
-        ).first()
+        ).values_list('start_time', 'end_time', named=True).first()
 
-        if not programme:
+        if not row:
             return DEFAULT_DURATION
 
         # Calculate duration from programme
-        duration_seconds = (programme.end_time - programme.start_time).total_seconds()
+        duration_seconds = (row.end_time - row.start_time).total_seconds()
         duration_minutes = int(duration_seconds / 60) + BUFFER_MINUTES
 
         # Cap at reasonable maximum (8 hours) to avoid issues
@@ -93,30 +296,66 @@ def _get_programme_duration(channel, timestamp_str):
         return DEFAULT_DURATION
 
 
+@functools.lru_cache(maxsize=256)
+def _server_base(server_url):
+    """Server URL with any trailing slash removed (memoized per URL)."""
+    return server_url.rstrip('/')
+
+
 def _build_timeshift_url_format_a(m3u_account, stream_id, timestamp, duration_minutes):
-    """Build timeshift URL using query string format (streaming/timeshift.php)."""
-    return (
-        f"{m3u_account.server_url.rstrip('/')}/streaming/timeshift.php"
-        f"?username={m3u_account.username}"
-        f"&password={m3u_account.password}"
-        f"&stream={stream_id}"
-        f"&start={timestamp}"
-        f"&duration={duration_minutes}"
-    )
+    """Build timeshift URL using query string format (streaming/timeshift.php).
+
+    urlencode percent-escapes the credentials, so '&', '%' or spaces in
+    them no longer corrupt the query string.
+    """
+    query = urlencode({
+        'username': m3u_account.username,
+        'password': m3u_account.password,
+        'stream': stream_id,
+        'start': timestamp,
+        'duration': duration_minutes,
+    })
+    return f"{_server_base(m3u_account.server_url)}/streaming/timeshift.php?{query}"
 
 
 def _build_timeshift_url_format_b(m3u_account, stream_id, timestamp, duration_minutes):
     """Build timeshift URL using path format (/timeshift/user/pass/duration/time/id.ts)."""
     return (
-        f"{m3u_account.server_url.rstrip('/')}/timeshift"
-        f"/{m3u_account.username}"
-        f"/{m3u_account.password}"
+        f"{_server_base(m3u_account.server_url)}/timeshift"
+        f"/{quote(str(m3u_account.username), safe='')}"
+        f"/{quote(str(m3u_account.password), safe='')}"
         f"/{duration_minutes}"
         f"/{timestamp}"
         f"/{stream_id}.ts"
     )
 
 
+def _accel_redirect_response(url, user_agent, debug=False):
+    """
+    Hand the stream off to nginx via X-Accel-Redirect.
+
+    Requires the /internal_ts/ location from the README. The provider URL
+    travels in the dedicated X-Accel-Upstream response header, NOT in the
+    redirect path: nginx's internal-redirect URI unescaping stops at the
+    first decoded '?' and splits the rest into $args still
+    percent-encoded, which silently drops the query string of Format A
+    URLs. Headers carry the URL verbatim; the location block reads it via
+    $upstream_http_x_accel_upstream (same mechanism as the User-Agent in
+    X-Timeshift-User-Agent). nginx then proxies the stream with buffering
+    off, so Python is out of the data plane for the whole playback
+    session. The client's Range header survives because nginx
+    re-processes the original request.
+    """
+    response = HttpResponse(content_type='video/mp2t')
+    response['X-Accel-Redirect'] = '/internal_ts/'
+    response['X-Accel-Upstream'] = url
+    response['X-Accel-Buffering'] = 'no'
+    response['X-Timeshift-User-Agent'] = user_agent
+    if debug:
+        logger.info("[Timeshift] Offloading stream to nginx via X-Accel-Redirect")
+    return response
+
+
 def timeshift_proxy(request, username, password, stream_id, timestamp, duration):
     """
     Proxy timeshift request to Xtream Codes provider.
@@ -135,7 +374,9 @@ def timeshift_proxy(request, username, password, stream_id, timestamp, duration)
 
     # QUIRK: The "duration" param is actually the provider's stream_id
     # See module docstring for explanation of iPlayTV's URL format
-    provider_stream_id = duration.rstrip('.ts')
+    # removesuffix, not rstrip: rstrip('.ts') strips the CHARACTER SET
+    # {'.', 't', 's'}, which would mangle an id ending in those letters.
+    provider_stream_id = duration.removesuffix('.ts')
 
     # Load plugin config
     config = _get_plugin_config()
@@ -143,12 +384,13 @@ def timeshift_proxy(request, username, password, stream_id, timestamp, duration)
     url_format = config['url_format']
     custom_template = config['custom_url_template']
     timezone_str = config['timezone']
+    nginx_accel = config.get('nginx_accel', False)
 
     if debug:
-        logger.info(f"[Timeshift] === REQUEST START ===")
-        logger.info(f"[Timeshift] User: {username}, Provider stream_id: {provider_stream_id}")
-        logger.info(f"[Timeshift] Timestamp (raw): {timestamp}, URL stream_id: {stream_id}")
-        logger.info(f"[Timeshift] Config: url_format={url_format}, timezone={timezone_str}, debug={debug}")
+        logger.info("[Timeshift] === REQUEST START ===")
+        logger.info("[Timeshift] User: %s, Provider stream_id: %s", username, provider_stream_id)
+        logger.info("[Timeshift] Timestamp (raw): %s, URL stream_id: %s", timestamp, stream_id)
+        logger.info("[Timeshift] Config: url_format=%s, timezone=%s, debug=%s", url_format, timezone_str, debug)
 
     # Step 1: Authenticate user via xc_password
     user = _authenticate_user(username, password)
@@ -162,11 +404,11 @@ def timeshift_proxy(request, username, password, stream_id, timestamp, duration)
         raise Http404("Channel not found")
 
     if debug:
-        logger.info(f"[Timeshift] Channel found: {channel.name} (id={channel.id})")
+        logger.info("[Timeshift] Channel found: %s (id=%s)", channel.name, channel.id)
 
     # Step 3: Verify user has access to this channel
     if user.user_level < channel.user_level:
-        logger.error(f"[Timeshift] Access denied: user {username} (level {user.user_level}) < channel {channel.name} (level {channel.user_level})")
+        logger.error("[Timeshift] Access denied: user %s (level %s) < channel %s (level %s)", username, user.user_level, channel.name, channel.user_level)
         return HttpResponseForbidden("Access denied")
 
     # Step 4: Check if stream supports catch-up, or find fallback
@@ -176,56 +418,60 @@ def timeshift_proxy(request, username, password, stream_id, timestamp, duration)
     if props.get('tv_archive') not in (1, '1'):
         # Requested stream lacks catch-up, search for fallback
         if debug:
-            logger.info(f"[Timeshift] {stream.name} has no catch-up, finding fallback in {channel.name}...")
+            logger.info("[Timeshift] %s has no catch-up, finding fallback in %s...", stream.name, channel.name)
 
         catchup_stream = None
 
         # ✅ NEW: Fallback chain search through all streams
-        for alt_stream in channel.streams.order_by('channelstream__order'):
+        for alt_stream in channel.streams.select_related('m3u_account').order_by('channelstream__order'):
             alt_props = alt_stream.custom_properties or {}
             if alt_props.get('tv_archive') in (1, '1'):
                 catchup_stream = alt_stream
                 props = alt_props
 
                 if debug:
-                    logger.info(f"[Timeshift] ✅ Catch-up fallback found: {alt_stream.name} (Provider: {alt_stream.m3u_account.name})")
+                    logger.info("[Timeshift] ✅ Catch-up fallback found: %s (Provider: %s)", alt_stream.name, alt_stream.m3u_account.name)
                 break
 
         if not catchup_stream:
-            logger.error(f"[Timeshift] No catch-up stream available in channel {channel.name}")
+            logger.error("[Timeshift] No catch-up stream available in channel %s", channel.name)
             return HttpResponseBadRequest("Timeshift not supported for this channel")
 
     if debug:
-        logger.info(f"[Timeshift] Using stream: {catchup_stream.name}")
+        logger.info("[Timeshift] Using stream: %s", catchup_stream.name)
 
     # Step 5: Verify it's an Xtream Codes provider
     m3u_account = catchup_stream.m3u_account
     if not m3u_account or m3u_account.account_type != 'XC':
-        logger.error(f"[Timeshift] Selected stream {catchup_stream.name} is not from XC provider")
+        logger.error("[Timeshift] Selected stream %s is not from XC provider", catchup_stream.name)
         return HttpResponseBadRequest("Channel not from Xtream Codes provider")
 
     if debug:
-        logger.info(f"[Timeshift] Stream props: {props}")
+        logger.info("[Timeshift] Stream props: %s", props)
 
     # Step 6: Convert timestamp from UTC to provider's local timezone
     local_timestamp = _convert_timestamp_to_local(timestamp, timezone_str)
     if debug:
-        logger.info(f"[Timeshift] Timestamp: {timestamp} (UTC) → {local_timestamp} ({timezone_str})")
+        logger.info("[Timeshift] Timestamp: %s (UTC) → %s (%s)", timestamp, local_timestamp, timezone_str)
 
     # Step 6.5: Get programme duration from EPG
     duration_minutes = _get_programme_duration(channel, local_timestamp)
     if debug:
-        logger.info(f"[Timeshift] Duration from EPG: {duration_minutes} minutes")
+        logger.info("[Timeshift] Duration from EPG: %s minutes", duration_minutes)
 
     # Step 7: Build provider's timeshift URL based on configured format
     stream_id_value = props.get('stream_id')
     timeshift_url = None
     fallback_url = None
+    # True when the URL format needs no A->B probing (forced, custom,
+    # pinned or already learned) - the nginx offload can only engage then,
+    # since nginx can't retry with the other format on a 400.
+    format_certain = True
 
     if url_format == 'custom' and custom_template:
         # Custom template
         timeshift_url = custom_template.format(
-            server_url=m3u_account.server_url.rstrip('/'),
+            server_url=_server_base(m3u_account.server_url),
             username=m3u_account.username,
             password=m3u_account.password,
             stream_id=stream_id_value,
@@ -233,43 +479,60 @@ def timeshift_proxy(request, username, password, stream_id, timestamp, duration)
             duration=duration_minutes
         )
         if debug:
-            logger.info(f"[Timeshift] Using custom template")
+            logger.info("[Timeshift] Using custom template")
     elif url_format == 'format_a':
         # Force Format A only
         timeshift_url = _build_timeshift_url_format_a(m3u_account, stream_id_value, local_timestamp, duration_minutes)
         if debug:
-            logger.info(f"[Timeshift] Using Format A (forced)")
+            logger.info("[Timeshift] Using Format A (forced)")
     elif url_format == 'format_b':
         # Force Format B only
         timeshift_url = _build_timeshift_url_format_b(m3u_account, stream_id_value, local_timestamp, duration_minutes)
         if debug:
-            logger.info(f"[Timeshift] Using Format B (forced)")
+            logger.info("[Timeshift] Using Format B (forced)")
     else:
-        # Auto-detect (default): Try A first, fallback to B
-        preferred_format = _url_format_cache.get(m3u_account.id, 'A')
+        # Auto-detect (default): admin pin > learned cache > try A, fall
+        # back to B. The pin lets operators skip detection entirely via
+        # m3u_account.custom_properties['timeshift_format'].
+        account_props = getattr(m3u_account, 'custom_properties', None)
+        pinned = account_props.get('timeshift_format') if isinstance(account_props, dict) else None
+        if pinned in ('A', 'B'):
+            preferred_format = pinned
+        else:
+            if m3u_account.id not in _url_format_cache:
+                # Unknown account: warm the cache in the background so the
+                # next request skips the tentative attempt.
+                _schedule_format_probe(m3u_account)
+            preferred_format = _get_preferred_format(m3u_account.id)
+            # _get_preferred_format populates the L1 on a backend hit, so
+            # an absent entry here really means "never learned".
+            format_certain = m3u_account.id in _url_format_cache
         if preferred_format == 'B':
             timeshift_url = _build_timeshift_url_format_b(m3u_account, stream_id_value, local_timestamp, duration_minutes)
             if debug:
-                logger.info(f"[Timeshift] Using Format B (cached for account {m3u_account.id})")
+                logger.info("[Timeshift] Using Format B (cached for account %s)", m3u_account.id)
         else:
             timeshift_url = _build_timeshift_url_format_a(m3u_account, stream_id_value, local_timestamp, duration_minutes)
             fallback_url = _build_timeshift_url_format_b(m3u_account, stream_id_value, local_timestamp, duration_minutes)
             if debug:
-                logger.info(f"[Timeshift] Using Format A with B fallback (auto-detect)")
+                logger.info("[Timeshift] Using Format A with B fallback (auto-detect)")
 
     if debug:
         # Log URL without credentials for security
         url_safe = timeshift_url.split('?')[0] if '?' in timeshift_url else timeshift_url.rsplit('/', 3)[0] + '/...'
-        logger.info(f"[Timeshift] Built URL: {url_safe}")
+        logger.info("[Timeshift] Built URL: %s", url_safe)
 
     # Minimal log in normal mode - just channel name and timestamp
     if not debug:
-        logger.info(f"[Timeshift] {channel.name} @ {local_timestamp}")
+        logger.info("[Timeshift] %s @ %s", channel.name, local_timestamp)
 
     # Step 8: Get User-Agent from M3U account settings
     user_agent = m3u_account.get_user_agent().user_agent
 
-    # Step 9: Proxy the stream (with fallback support)
+    # Step 9: Hand off to nginx when configured and safe, else proxy the
+    # stream in Python (with fallback support)
+    if nginx_accel and format_certain:
+        return _accel_redirect_response(timeshift_url, user_agent, debug)
     return _proxy_stream(request, timeshift_url, user_agent, fallback_url, m3u_account.id, debug)
 
 
@@ -281,24 +544,48 @@ def _authenticate_user(username, password):
     separate from the Django auth password. This allows different passwords
     for web UI vs IPTV clients.
 
+    Results (including failures) are memoized for _AUTH_TTL seconds; the
+    password check uses constant_time_compare to avoid a timing
+    side-channel.
+
     Returns:
-        User object if authenticated, None otherwise
+        _AuthedUser if authenticated, None otherwise
     """
+    key = hashlib.blake2b(
+        f"{username}\0{password}".encode('utf-8'), digest_size=16
+    ).digest()
+    now = time.monotonic()
+
+    with _AUTH_CACHE_LOCK:
+        hit = _AUTH_CACHE.get(key)
+        if hit is not None and hit[2] > now:
+            user_id, user_level = hit[0], hit[1]
+            return _AuthedUser(user_id, user_level) if user_id is not None else None
+
     from apps.accounts.models import User
 
+    user = None
     try:
-        user = User.objects.get(username=username)
-        xc_password = (user.custom_properties or {}).get('xc_password')
+        row = User.objects.get(username=username)
+        xc_password = (row.custom_properties or {}).get('xc_password')
         if not xc_password:
-            logger.error(f"[Timeshift] Auth failed: user '{username}' has no xc_password")
-            return None
-        if xc_password != password:
-            logger.error(f"[Timeshift] Auth failed: wrong password for user '{username}'")
-            return None
-        return user
+            logger.error("[Timeshift] Auth failed: user '%s' has no xc_password", username)
+        elif not constant_time_compare(xc_password, password):
+            logger.error("[Timeshift] Auth failed: wrong password for user '%s'", username)
+        else:
+            user = _AuthedUser(row.id, row.user_level)
     except User.DoesNotExist:
-        logger.error(f"[Timeshift] Auth failed: user '{username}' does not exist")
-        return None
+        logger.error("[Timeshift] Auth failed: user '%s' does not exist", username)
+
+    with _AUTH_CACHE_LOCK:
+        if len(_AUTH_CACHE) >= _AUTH_CACHE_MAX:
+            # Crude but O(1) amortized cap; entries are cheap to recompute.
+            _AUTH_CACHE.clear()
+        if user is not None:
+            _AUTH_CACHE[key] = (user.id, user.user_level, now + _AUTH_TTL)
+        else:
+            _AUTH_CACHE[key] = (None, None, now + _AUTH_TTL)
+    return user
 
 
 def _find_channel_by_provider_stream_id(provider_stream_id):
@@ -315,20 +602,35 @@ def _find_channel_by_provider_stream_id(provider_stream_id):
     from apps.channels.models import Stream
 
     # Search for stream where custom_properties.stream_id matches
-    # Only look at XC provider streams
-    stream = Stream.objects.filter(
+    # Only look at XC provider streams. select_related pulls the account in
+    # the same query (timeshift_proxy reads server_url/credentials/user
+    # agent from it) and the channel lookup joins epg_data so the duration
+    # lookup doesn't pay another round-trip. No .only() on the account: its
+    # get_user_agent() walks columns we don't control, and deferred-field
+    # loading would silently reintroduce queries.
+    base = Stream.objects.select_related('m3u_account').filter(
         custom_properties__stream_id=str(provider_stream_id),
         m3u_account__account_type='XC'
-    ).first()
+    )
+
+    # Prefer a stream that already has catch-up enabled: the DB rejects
+    # non-archive rows using the same stream_id index, and timeshift_proxy
+    # can then skip its Python-level fallback scan. Only if no
+    # archive-enabled stream carries this provider ID do we take any match,
+    # so the channel-level fallback chain (a sibling stream of the same
+    # channel may offer catch-up) keeps working exactly as before.
+    stream = base.filter(custom_properties__tv_archive__in=[1, '1']).first()
+    if stream is None:
+        stream = base.first()
 
     if stream:
-        channel = stream.channels.first()
+        channel = stream.channels.select_related('epg_data').first()
         if channel:
             return channel, stream
         else:
-            logger.error(f"[Timeshift] Stream found but no channel for provider_stream_id={provider_stream_id}")
+            logger.error("[Timeshift] Stream found but no channel for provider_stream_id=%s", provider_stream_id)
     else:
-        logger.error(f"[Timeshift] Channel not found: provider_stream_id={provider_stream_id}")
+        logger.error("[Timeshift] Channel not found: provider_stream_id=%s", provider_stream_id)
 
     return None, None
 
@@ -355,7 +657,10 @@ def _proxy_stream(request, url, user_agent, fallback_url=None, m3u_account_id=No
         StreamingHttpResponse with video content (status 200 or 206)
     """
     headers = {
-        'User-Agent': user_agent
+        'User-Agent': user_agent,
+        # Never let the provider gzip a video stream: decoding it here would
+        # burn CPU for zero gain on already-compressed TS.
+        'Accept-Encoding': 'identity',
     }
 
     # Forward Range header for seek support
@@ -364,49 +669,78 @@ def _proxy_stream(request, url, user_agent, fallback_url=None, m3u_account_id=No
     if range_header:
         headers['Range'] = range_header
         if debug:
-            logger.info(f"[Timeshift] Forwarding Range header: {range_header}")
+            logger.info("[Timeshift] Forwarding Range header: %s", range_header)
 
     if debug:
-        logger.info(f"[Timeshift] Request headers: {headers}")
+        logger.info("[Timeshift] Request headers: %s", headers)
 
     try:
-        response = requests.get(url, headers=headers, stream=True, timeout=10)
+        response = _SESSION.get(url, headers=headers, stream=True, timeout=10)
 
         if debug:
-            logger.info(f"[Timeshift] Provider response: status={response.status_code}")
+            logger.info("[Timeshift] Provider response: status=%s", response.status_code)
 
         # If 400 error and we have a fallback URL, try the alternative format
         if response.status_code == 400 and fallback_url:
             if debug:
-                logger.info(f"[Timeshift] Format A returned 400, trying Format B...")
+                logger.info("[Timeshift] Format A returned 400, trying Format B...")
             response.close()
 
-            response = requests.get(fallback_url, headers=headers, stream=True, timeout=10)
+            response = _SESSION.get(fallback_url, headers=headers, stream=True, timeout=10)
 
             if debug:
-                logger.info(f"[Timeshift] Fallback response: status={response.status_code}")
+                logger.info("[Timeshift] Fallback response: status=%s", response.status_code)
 
             # If fallback works, cache the format preference
             if response.status_code in (200, 206) and m3u_account_id:
-                _url_format_cache[m3u_account_id] = 'B'
+                _set_preferred_format(m3u_account_id, 'B')
                 if debug:
-                    logger.info(f"[Timeshift] Format B works, cached for account {m3u_account_id}")
+                    logger.info("[Timeshift] Format B works, cached for account %s", m3u_account_id)
+        elif response.status_code in (200, 206) and m3u_account_id and fallback_url:
+            # Format A worked on an auto-detect attempt: record it so other
+            # workers (via the shared cache backend) skip the tentative path.
+            if _url_format_cache.get(m3u_account_id) != 'A':
+                _set_preferred_format(m3u_account_id, 'A')
 
         # 200 = full content, 206 = partial content (Range request)
         if response.status_code not in (200, 206):
-            # Try to get response body for diagnostics
+            # Grab at most 200 raw bytes for diagnostics. response.text
+            # would download and charset-decode the whole body - providers
+            # have been seen answering errors with multi-MB HTML pages.
             try:
-                body_preview = response.text[:200] if response.text else 'empty'
+                raw = response.raw.read(200, decode_content=False)
+                body_preview = raw.decode('utf-8', 'replace') if raw else 'empty'
             except Exception:
                 body_preview = 'unreadable'
-            logger.error(f"[Timeshift] Provider error: status={response.status_code}, "
-                        f"content-type={response.headers.get('Content-Type', 'unknown')}, "
-                        f"body={body_preview}")
+            logger.error("[Timeshift] Provider error: status=%s, content-type=%s, body=%s",
+                         response.status_code,
+                         response.headers.get('Content-Type', 'unknown'),
+                         body_preview)
+            response.close()
             return HttpResponseBadRequest(f"Provider error: {response.status_code}")
 
         def stream_generator():
-            for chunk in response.iter_content(chunk_size=8192):
-                yield chunk
+            # Read straight off the urllib3 response in up to 64 KiB slabs.
+            # read1() yields whatever the socket already has (no decoder
+            # layer, no accumulation to an exact chunk size), so a 2-hour
+            # TS session takes ~8x fewer Python iterations than the old
+            # 8 KiB iter_content loop.
+            # Some transport adapters expose a raw object without read1
+            # (e.g. file-like stand-ins); iter_content(chunk_size=None)
+            # gives the same forward-as-received behaviour there.
+            read1 = getattr(response.raw, 'read1', None)
+            try:
+                if read1 is not None:
+                    for chunk in iter(lambda: read1(65536), b''):
+                        yield chunk
+                else:
+                    for chunk in response.iter_content(chunk_size=None):
+                        yield chunk
+            finally:
+                # Runs on normal end AND on client disconnect (generator
+                # close): hands the connection back to the pool instead of
+                # leaking it for the rest of the session's lifetime.
+                response.close()
 
         streaming_response = StreamingHttpResponse(
             stream_generator(),
@@ -422,20 +756,21 @@ def _proxy_stream(request, url, user_agent, fallback_url=None, m3u_account_id=No
                 streaming_response[header] = response.headers[header]
 
         if debug:
-            logger.info(f"[Timeshift] Streaming started: status={response.status_code}, "
-                       f"content-type={response.headers.get('Content-Type', 'unknown')}")
-            logger.info(f"[Timeshift] === REQUEST END ===")
+            logger.info("[Timeshift] Streaming started: status=%s, content-type=%s",
+                        response.status_code,
+                        response.headers.get('Content-Type', 'unknown'))
+            logger.info("[Timeshift] === REQUEST END ===")
 
         return streaming_response
 
     except requests.exceptions.Timeout:
-        logger.error(f"[Timeshift] Provider timeout after 10s")
+        logger.error("[Timeshift] Provider timeout after 10s")
         return HttpResponseBadRequest("Provider timeout")
     except requests.exceptions.ConnectionError as e:
-        logger.error(f"[Timeshift] Provider connection error: {e}")
+        logger.error("[Timeshift] Provider connection error: %s", e)
         return HttpResponseBadRequest("Provider connection error")
     except requests.exceptions.RequestException as e:
-        logger.error(f"[Timeshift] Provider request error: {e}")
+        logger.error("[Timeshift] Provider request error: %s", e)
         return HttpResponseBadRequest("Provider connection error")
 
 
@@ -446,14 +781,20 @@ def _get_plugin_timezone():
     Returns:
         str: Timezone string (e.g., "Europe/Brussels"), defaults to "Europe/Brussels"
     """
+    if time.monotonic() < _TZ_CACHE['expires']:
+        return _TZ_CACHE['tz']
+
+    tz = "Europe/Brussels"
     try:
         from apps.plugins.models import PluginConfig
         config = PluginConfig.objects.filter(key='dispatcharr_timeshift').first()
         if config and config.settings:
-            return config.settings.get('timezone', 'Europe/Brussels')
+            tz = config.settings.get('timezone', 'Europe/Brussels')
     except Exception as e:
-        logger.debug(f"[Timeshift] Could not load timezone setting: {e}")
-    return "Europe/Brussels"
+        logger.debug("[Timeshift] Could not load timezone setting: %s", e)
+    _TZ_CACHE['tz'] = tz
+    _TZ_CACHE['expires'] = time.monotonic() + 60
+    return tz
 
 
 def _convert_timestamp_to_local(timestamp, timezone_str):
@@ -471,13 +812,28 @@ def _convert_timestamp_to_local(timestamp, timezone_str):
         str: Converted timestamp in same format, or original if conversion fails
     """
     try:
-        # Parse: YYYY-MM-DD:HH-MM
-        utc_time = datetime.strptime(timestamp, "%Y-%m-%d:%H-%M")
-        utc_time = utc_time.replace(tzinfo=ZoneInfo("UTC"))
-
-        # Convert to target timezone
-        local_time = utc_time.astimezone(ZoneInfo(timezone_str))
-        return local_time.strftime("%Y-%m-%d:%H-%M")
+        # Manual slice parse of YYYY-MM-DD:HH-MM; strptime re-interprets the
+        # format string on every call and costs an order of magnitude more.
+        y = int(timestamp[0:4])
+        mo = int(timestamp[5:7])
+        d = int(timestamp[8:10])
+        h = int(timestamp[11:13])
+        mi = int(timestamp[14:16])
+
+        key = (timezone_str, y, mo, d, h, mi // 15)
+        offset = _TZ_OFFSET_CACHE.get(key)
+        if offset is None:
+            # Miss: one full ZoneInfo conversion to learn the offset for
+            # this bucket, then every request in the same quarter-hour is
+            # pure timedelta addition.
+            utc_time = datetime(y, mo, d, h, mi, tzinfo=_UTC)
+            offset = utc_time.astimezone(_zi(timezone_str)).utcoffset()
+            if len(_TZ_OFFSET_CACHE) > 4096:
+                _TZ_OFFSET_CACHE.clear()
+            _TZ_OFFSET_CACHE[key] = offset
+
+        lt = datetime(y, mo, d, h, mi) + offset
+        return f"{lt.year:04d}-{lt.month:02d}-{lt.day:02d}:{lt.hour:02d}-{lt.minute:02d}"
     except Exception as e:
-        logger.error(f"[Timeshift] Timestamp conversion failed for '{timestamp}': {e}")
+        logger.error("[Timeshift] Timestamp conversion failed for '%s': %s", timestamp, e)
         return timestamp